@@ -0,0 +1,144 @@
+'''Frame time benchmark. Plays scripted scenarios on forced waves with the headless session, and writes the time spent
+in every stage of the frame as p50/p95/p99 to a JSON report that can be compared between commits.
+Example : python benchmark.py --waves 1 10 15 --frames 600 --output benchmark.json'''
+import headless
+from headless import core, AutoPilot, HeadlessSession
+import pygame
+import json
+import argparse
+import sys
+import subprocess
+from math import cos, sin, ceil
+from random import choices
+from game.enemy import BaseZombie
+from game.projectiles import BaseProjectile
+from utils.profiler import profiler
+
+class ScriptedPilot(AutoPilot):
+    '''Same as AutoPilot, but the player also circles around the middle of the screen.'''
+    def __init__(self, radius : float = 120, turn_speed : float = 0.5) -> None:
+        super().__init__(god_mode=True)
+        self.radius : float = radius
+        self.turn_speed : float = turn_speed
+        self.angle : float = 0
+
+    def update(self):
+        player = core.game.player
+        if core.game.is_nm_state() and player is not None:
+            self.angle += self.turn_speed * core.fixed_dt
+            center = pygame.Vector2(headless.window_size) / 2
+            player.position = center + pygame.Vector2(cos(self.angle), sin(self.angle)) * self.radius
+        super().update()
+
+class Scenario:
+    '''Plays a wave of the difficulty table. When saturated, the game stops spawning by itself and the zombie count is kept
+    at the total of the wave instead, so every measured frame has the same load.'''
+    def __init__(self, wave : int, frames : int = 600, warmup : int = 60, saturate : bool = True, seed : int = 0,
+                 weapon : str = 'Shotgun', armor : str|None = 'Light') -> None:
+        self.wave : int = wave
+        self.frames : int = frames
+        self.warmup : int = warmup
+        self.saturate : bool = saturate
+        self.seed : int = seed
+        self.weapon : str = weapon
+        self.armor : str|None = armor
+
+    @property
+    def name(self) -> str:
+        return f'wave_{self.wave}' + ('_saturated' if self.saturate else '')
+
+    def force_wave(self):
+        game = core.game
+        game.current_wave_num = self.wave - 1
+        game.current_area = min((self.wave - 1) // 5, 2)
+        game.background.switch_area(game.current_area)
+        game.next_wave()
+        if self.saturate: game.enemy_timer.set_duration(-1)
+
+    def top_up(self):
+        if not self.saturate: return
+        zombie_count : dict[str, int] = core.game.diff_table[self.wave].zombie_count
+        target : int = sum(zombie_count.values())
+        missing : int = target - len(BaseZombie.active_elements)
+        if missing <= 0: return
+        for zombie_type in choices(list(zombie_count.keys()), list(zombie_count.values()), k=missing):
+            core.game.spawn_enemy(zombie_type)
+
+    def run(self) -> dict:
+        session = HeadlessSession(self.seed, control_method='Simple', weapon=self.weapon, armor=self.armor, god_mode=True, render=True)
+        session.autopilot = ScriptedPilot()
+        session.start()
+        self.force_wave()
+        for _ in range(self.warmup):
+            self.top_up()
+            session.step()
+
+        frames : list[dict[str, int]] = []
+        zombies : int = 0
+        projectiles : int = 0
+        profiler.enabled = True
+        for _ in range(self.frames):
+            if not session.is_running(): break
+            self.top_up()
+            session.step()
+            frames.append(profiler.current)
+            zombies += len(BaseZombie.active_elements)
+            projectiles += len(BaseProjectile.active_elements)
+        profiler.enabled = False
+        session.close()
+
+        count : int = max(len(frames), 1)
+        sections : set[str] = set().union(*frames) if frames else set()
+        return {'wave' : self.wave, 'saturated' : self.saturate, 'seed' : self.seed, 'weapon' : self.weapon, 'armor' : self.armor,
+                'frames' : len(frames), 'avg_zombies' : zombies / count, 'avg_projectiles' : projectiles / count,
+                'sections' : {name : get_stats([frame.get(name, 0) for frame in frames]) for name in sorted(sections)}}
+
+def get_percentile(sorted_values : list[float], percent : float) -> float:
+    '''Nearest-rank percentile of an already sorted list.'''
+    if not sorted_values: return 0
+    rank = max(ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def get_stats(values_ns : list[int]) -> dict[str, float]:
+    '''Returns the mean, max and percentiles of values_ns in milliseconds.'''
+    values = sorted(value / 1_000_000 for value in values_ns)
+    return {'mean' : sum(values) / len(values) if values else 0, 'p50' : get_percentile(values, 50), 'p95' : get_percentile(values, 95),
+            'p99' : get_percentile(values, 99), 'max' : values[-1] if values else 0}
+
+def get_commit() -> str|None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures frame times on scripted wave scenarios.')
+    parser.add_argument('--waves', type=int, nargs='+', default=[1, 10, 15])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--weapon', default='Shotgun', choices=core.storage.ALL_WEAPONS)
+    parser.add_argument('--armor', default='Light', choices=core.storage.ALL_ARMORS)
+    parser.add_argument('--no-saturate', action='store_true', help='Lets the game spawn the wave by itself')
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--batch-movement', action='store_true', help='Moves the zombies with BaseZombie.movement_batch')
+    parser.add_argument('--batch-projectiles', action='store_true', help='Moves the projectiles with BaseProjectile.batch')
+    args = parser.parse_args()
+    BaseZombie.USE_BATCH_MOVEMENT = args.batch_movement
+    BaseProjectile.USE_BATCH_INTEGRATION = args.batch_projectiles
+
+    report = {'commit' : get_commit(), 'python' : sys.version.split()[0], 'pygame' : pygame.version.ver, 'unit' : 'ms', 'scenarios' : {}}
+    for wave in args.waves:
+        scenario = Scenario(wave, args.frames, args.warmup, not args.no_saturate, args.seed, args.weapon, args.armor)
+        result = scenario.run()
+        report['scenarios'][scenario.name] = result
+        frame_stats = result['sections'].get('frame', get_stats([]))
+        print(f"{scenario.name} : {result['frames']} frames, {result['avg_zombies']:.0f} zombies, "
+              f"p50 {frame_stats['p50']:.2f}ms p95 {frame_stats['p95']:.2f}ms p99 {frame_stats['p99']:.2f}ms")
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'Report written to {args.output}')
+
+if __name__ == '__main__':
+    main()
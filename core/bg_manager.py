@@ -10,6 +10,7 @@ class BgManager:
         self.current : dict[pygame.mixer.Channel, TrackInfo] = {}
         self.global_volume = 1
         self.sound_types = SoundTypes
+        self.muted : bool = False
 
     def set_global_volume(self, new_volume):
         self.global_volume = new_volume
@@ -21,14 +22,18 @@ class BgManager:
 
     def play(self, track : pygame.mixer.Sound, volume, loops = -1, maxtime = 0, fade_ms = 0, sound_type : str|None = 'Music'):
         '''Used for playing music.'''
+        if self.muted: return None
         channel = track.play(loops, maxtime, fade_ms)
+        if channel is None: return None
         channel.set_volume(volume * self.global_volume)
         self.current[channel] = TrackInfo(volume, sound_type)
         return channel
     
     def play_sfx(self, sfx : pygame.mixer.Sound, volume, loops = 0, maxtime = 0, fade_ms = 0, sound_type : str|None = 'SFX'):
         '''Used for playing short sound effects.'''
+        if self.muted: return None
         channel = sfx.play(loops, maxtime, fade_ms)
+        if channel is None: return None
         channel.set_volume(volume * self.global_volume)
         self.current[channel] = TrackInfo(volume, sound_type)
         return channel
@@ -1,14 +1,19 @@
 import pygame
-from time import perf_counter
+from time import perf_counter, perf_counter_ns
 from collections import deque
 
-from utils.my_timer import Timer
+from utils.my_timer import Timer, FrameClock, ManualClock
+from utils.profiler import Profiler, profiler
 from core.event_manger import EventManger
+from utils.input_state import InputState, input_state
 import game.game_module
 from game.sprite import Sprite
 from core.settings import Settings
 from core.bg_manager import BgManager
 from core.ui import Ui
+from utils.ui.profiler_overlay import ProfilerOverlay
+from core.dirty_renderer import DirtyRectRenderer
+from core.post_process import PostProcessStep, BrightnessStep
 from core.menu import Menu
 import core.menu
 from game.game_module import Game
@@ -18,7 +23,8 @@ from utils.tween_module import TweenTrack, TweenChain
 from utils.animation import AnimationTrack
 import sys
 import platform
-from typing import Any
+import random
+from typing import Any, Callable
 
 WEBPLATFORM = 'emscripten'
 
@@ -30,15 +36,21 @@ class Core:
     def __init__(self) -> None:
         self.FPS = 60
         self.PERFORMANCE_MODE = False
+        self.USE_DIRTY_RECTS : bool = False
+        self.USE_FRAME_CLOCK : bool = True
+        self.HEADLESS : bool = False
+        self.fixed_dt : float|None = None
+        self.clock : Callable[[], float] = perf_counter
         self.WEBPLATFORM = 'emscripten'
         self.CURRENT_PLATFORM = sys.platform
         self.main_display : pygame.Surface
-        self.brightness_map = pygame.Surface((2000, 2000), pygame.SRCALPHA)
-        pygame.draw.rect(self.brightness_map, (255, 255, 255, 0), (0,0, 2000, 2000))
+        self.brightness_step : BrightnessStep = BrightnessStep(0)
+        self.post_process_steps : list[PostProcessStep] = [self.brightness_step]
         self.event_manager = EventManger()
         self.make_connections()
 
-        self.active_fingers : dict[int, tuple[float, float]] = {}
+        self.input_state : InputState = input_state
+        self.active_fingers : dict[int, tuple[float, float]] = self.input_state.fingers
         self.dt : float = 1
         self.last_dt_measurment : float = 0
 
@@ -49,12 +61,16 @@ class Core:
         self.game = Game()
         self.storage = GameStorage()
         self.task_scheduler = TaskScheduler()
+        self.profiler : Profiler = profiler
+        self.profiler_overlay : ProfilerOverlay = ProfilerOverlay(profiler, (10, 505))
         self.delta_stream : deque[float] = deque([1 for _ in range(30)])
         self.dirty_display_rects : list[pygame.Rect] = []
-        self.brightness_map_blend_mode = pygame.BLENDMODE_NONE
+        self.dirty_renderer : DirtyRectRenderer = DirtyRectRenderer()
 
-        self.global_timer : Timer = Timer(-1, perf_counter, 1)
+        self.frame_clock : FrameClock = FrameClock(self.clock)
+        self.global_timer : Timer = Timer(-1, self.clock, 1)
         Timer.time_source = self.global_timer.get_time
+        self.set_frame_clock(self.USE_FRAME_CLOCK)
 
         self.window_bools : dict = {'Shown' : True, 'input_focused' : True}
         self.debug_sprite : TextSprite
@@ -93,10 +109,12 @@ class Core:
         self.save_storage()
     
     def save_storage(self):
+        if self.HEADLESS: return
         if not self.is_web(): self.storage.save_to_file()
         else: self.storage.save_to_web()
     
     def save_settings(self):
+        if self.HEADLESS: return
         if not self.is_web(): self.settings.save()
         else: self.settings.save_web()
 
@@ -130,11 +148,16 @@ class Core:
         if self.IS_DEBUG: 
             self.main_ui.add(self.fps_sprite)
             self.main_ui.add(self.debug_sprite)
+            if self.profiler.enabled: self.main_ui.add(self.profiler_overlay)
         
     def detect_game_exit(self, event : pygame.Event):
         if event.type == pygame.KEYDOWN: 
             if event.key == pygame.K_ESCAPE:
                 self.end_game(None)
+            elif event.key == pygame.K_F3 and self.IS_DEBUG:
+                self.set_profiling(not self.profiler.enabled)
+            elif event.key == pygame.K_F4 and self.IS_DEBUG and not self.is_web():
+                self.profiler.export_chrome_trace('profile_trace.json')
             #elif event.key == pygame.K_F1:
                 #pygame.image.save_extended(core.main_display, 'assets/screenshots/game_capture2.png', '.png')
     
@@ -178,32 +201,81 @@ class Core:
         pygame.quit()
         exit()
     
+    def set_frame_clock(self, enabled : bool):
+        '''In frame clock mode, the time is sampled once per frame in update_dt and every timer reads that sample.'''
+        self.USE_FRAME_CLOCK = enabled
+        if enabled: self.frame_clock.sample()
+        self.global_timer.time_source = self.frame_clock.get_time if enabled else self.clock
+        Timer.frame_cache = enabled
+        Timer.clock_epoch += 1
+    
+    def set_clock(self, clock : Callable[[], float]):
+        '''Replaces the clock every timer ultimately reads (perf_counter by default). 
+        Call it before starting a game, the global timer is restarted on the new clock.'''
+        self.clock = clock
+        self.frame_clock.clock = clock
+        self.global_timer.time_source = self.frame_clock.get_time if self.USE_FRAME_CLOCK else clock
+        if self.USE_FRAME_CLOCK: self.frame_clock.sample()
+        self.global_timer.restart()
+        self.last_dt_measurment = 0
+    
+    def setup_headless(self, seed : int|None = 0, fixed_dt : float = 1 / 60):
+        '''Makes the simulation deterministic: time only advances by fixed_dt every update_dt, 
+        the random module is seeded, no sound is played and nothing is saved to disk. 
+        The SDL dummy drivers have to be set before pygame.init for the game to run without a window.'''
+        self.HEADLESS = True
+        self.fixed_dt = fixed_dt
+        self.bg_manager.muted = True
+        random.seed(seed)
+        self.set_clock(ManualClock())
+    
     def update_dt(self, target_fps : int|float = 60):
+        if self.fixed_dt is not None:
+            if isinstance(self.clock, ManualClock): self.clock.advance(self.fixed_dt)
+            if self.USE_FRAME_CLOCK: self.frame_clock.sample()
+            self.dt = self.fixed_dt * target_fps
+            return
+        if self.USE_FRAME_CLOCK: self.frame_clock.sample()
         if self.last_dt_measurment == 0:
             self.dt = 1
-            self.last_dt_measurment = perf_counter()
+            self.last_dt_measurment = self.frame_clock.time if self.USE_FRAME_CLOCK else self.clock()
         else:
-            mark = perf_counter()
+            mark = self.frame_clock.time if self.USE_FRAME_CLOCK else self.clock()
             self.dt = (mark - self.last_dt_measurment) * target_fps
             self.last_dt_measurment = mark
     
+    def set_profiling(self, enabled : bool):
+        '''Turns the frame profiler on or off, and shows its overlay while a game is running.'''
+        self.profiler.enabled = enabled
+        if not enabled:
+            self.main_ui.remove(self.profiler_overlay)
+            return
+        self.profiler.clear()
+        if self.game.active: self.main_ui.add(self.profiler_overlay)
+    
     def set_debug_message(self, text : str):
         debug_textsprite : TextSprite = core_object.main_ui.get_sprite('debug_sprite')
         if not debug_textsprite: return
         debug_textsprite.text = text
     
     def set_brightness(self, new_val : int):
-        brightness = new_val
-        abs_brightness = abs(new_val)
-        if brightness >= 0:
-            pygame.draw.rect(self.brightness_map, (abs_brightness, abs_brightness, abs_brightness), (0,0, 2000, 2000))
-            self.brightness_map_blend_mode = pygame.BLEND_RGB_ADD
-        else:
-            pygame.draw.rect(self.brightness_map, (abs_brightness, abs_brightness, abs_brightness), (0,0, 2000, 2000))
-            self.brightness_map_blend_mode = pygame.BLEND_RGB_SUB
+        self.brightness_step.brightness = new_val
+    
+    def add_post_process_step(self, step : PostProcessStep, index : int|None = None):
+        if step in self.post_process_steps: return
+        if index is None: self.post_process_steps.append(step)
+        else: self.post_process_steps.insert(index, step)
+    
+    def remove_post_process_step(self, step : PostProcessStep):
+        if step in self.post_process_steps: self.post_process_steps.remove(step)
+    
+    def apply_post_process(self, display : pygame.Surface, rects : list[pygame.Rect]|None = None):
+        '''Applies every active post process step in order. Only rects are processed if any are given.'''
+        for step in self.post_process_steps:
+            if step.is_active(): step.apply(display, rects)
     
     def make_connections(self):
-        self.event_manager.bound_actions[pygame.QUIT] = [self.close_game]
+        self.event_manager.quit_action = self.close_game
 
         self.event_manager.bind(self.START_GAME, self.start_game)
         self.event_manager.bind(self.END_GAME, self.end_game)
@@ -308,8 +380,10 @@ class Core:
 
     def update(self):
         self.task_scheduler.update()
+        if profiler.enabled: start = perf_counter_ns()
         TweenTrack.update_all()
         TweenChain.update_all()
+        if profiler.enabled: profiler.add('tweens', start)
         self.update_delta_stream()
         self.bg_manager.update()
         AnimationTrack.update_all_elements()
@@ -0,0 +1,118 @@
+import pygame
+from game.sprite import Sprite
+from core.ui import Ui
+from utils.helpers import ColorType
+
+class DirtyRectRenderer:
+    '''Opt-in game renderer that only repaints and presents the parts of the screen that can have changed.
+    Every rect drawn on the previous or the current frame is marked on a grid of tiles. The background is restored
+    and the sprites are redrawn over those tiles only, and the marked tiles are merged into disjoint rects
+    for pygame.display.update. The whole screen is redrawn when too many tiles are marked.'''
+    def __init__(self, tile_size : int = 32, full_redraw_threshold : float = 0.6) -> None:
+        self.tile_size : int = tile_size
+        self.full_redraw_threshold : float = full_redraw_threshold
+        self.previous_rects : list[pygame.Rect] = []
+        self.needs_full_redraw : bool = True
+        self.last_background_surf : pygame.Surface|None = None
+        self.screen_rect : pygame.Rect = pygame.Rect(0, 0, 0, 0)
+        self.columns : int = 0
+        self.rows : int = 0
+
+    def invalidate(self):
+        '''Forces the next frame to be redrawn entirely. Call it whenever something else drew on the display.'''
+        self.needs_full_redraw = True
+
+    def render(self, display : pygame.Surface, ui : Ui, background : Sprite|None = None,
+               fill_color : ColorType = (94, 129, 162)) -> list[pygame.Rect]:
+        '''Draws the active sprites then the ui. Returns the rects that changed, or an empty list if the whole display did.'''
+        if display.get_rect() != self.screen_rect: self.resize(display.get_rect())
+        sprites = Sprite.get_render_order()
+        current_rects : list[pygame.Rect] = self.get_draw_rects(sprites, ui, background)
+        background_surf = background.image if background is not None else None
+        if background_surf is not self.last_background_surf:
+            self.last_background_surf = background_surf
+            self.needs_full_redraw = True
+
+        dirty_rects : list[pygame.Rect]|None = None
+        if not self.needs_full_redraw:
+            dirty_rects = self.get_dirty_rects(self.previous_rects + current_rects)
+        self.previous_rects = current_rects
+
+        if dirty_rects is None:
+            self.needs_full_redraw = False
+            display.fill(fill_color)
+            Sprite.draw_all_sprites(display)
+            ui.render(display)
+            return []
+
+        for rect in dirty_rects:
+            display.set_clip(rect)
+            display.fill(fill_color)
+            if background is not None: background.draw(display)
+        display.set_clip(None)
+        for sprite in sprites:
+            if sprite is background: continue
+            sprite.draw(display)
+        ui.render(display)
+        return dirty_rects
+
+    def resize(self, screen_rect : pygame.Rect):
+        self.screen_rect = screen_rect.copy()
+        self.columns = -(-screen_rect.width // self.tile_size)
+        self.rows = -(-screen_rect.height // self.tile_size)
+        self.needs_full_redraw = True
+
+    @staticmethod
+    def get_draw_rects(sprites : list[Sprite], ui : Ui, background : Sprite|None) -> list[pygame.Rect]:
+        '''Returns the area every sprite and ui element will cover when drawn.
+        Blits only use the topleft of the rect, so the surface size is used in case the rect is out of date.'''
+        rects : list[pygame.Rect] = []
+        for sprite in sprites:
+            if sprite is background or sprite.rect is None: continue
+            rects.append(sprite.rect.union((sprite.rect.topleft, sprite.image.get_size())))
+        for element in ui.complete_list:
+            if not element.visible or element.rect is None: continue
+            if element.surf is None:
+                rects.append(element.rect.copy())
+            else:
+                rects.append(element.rect.union((element.rect.topleft, element.surf.get_size())))
+        return rects
+
+    def get_dirty_rects(self, rects : list[pygame.Rect]) -> list[pygame.Rect]|None:
+        '''Marks the tiles touched by rects and merges them into disjoint rects.
+        Returns None when the marked area is above the full redraw threshold.'''
+        size = self.tile_size
+        columns, rows = self.columns, self.rows
+        screen_rect = self.screen_rect
+        tiles = bytearray(columns * rows)
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if not rect.width or not rect.height: continue
+            left, right = rect.left // size, (rect.right - 1) // size + 1
+            run = b'\x01' * (right - left)
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                start = row * columns
+                tiles[start + left : start + right] = run
+
+        if tiles.count(1) > self.full_redraw_threshold * len(tiles): return None
+
+        dirty_rects : list[pygame.Rect] = []
+        open_runs : dict[tuple[int, int], pygame.Rect] = {}
+        for row in range(rows):
+            start = row * columns
+            row_runs : dict[tuple[int, int], pygame.Rect] = {}
+            column = tiles.find(1, start, start + columns)
+            while column != -1:
+                end = tiles.find(0, column, start + columns)
+                if end == -1: end = start + columns
+                key = (column - start, end - start)
+                rect = open_runs.pop(key, None)
+                if rect is None:
+                    rect = pygame.Rect(key[0] * size, row * size, (key[1] - key[0]) * size, size)
+                    dirty_rects.append(rect)
+                else:
+                    rect.height += size
+                row_runs[key] = rect
+                column = tiles.find(1, end, start + columns)
+            open_runs = row_runs
+        return [rect.clip(screen_rect) for rect in dirty_rects]
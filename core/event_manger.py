@@ -1,16 +1,66 @@
 import pygame
 from sys import exit
+from typing import Callable, Iterable, Any
+
+EventAction = Callable[[pygame.Event], Any]
+
+class EventHandle:
+    '''One bound action, returned by EventManger.connect. Pass it to EventManger.disconnect to unbind it.'''
+    __slots__ = ('event_type', 'action', 'priority', 'order', 'active')
+    def __init__(self, event_type : int, action : EventAction, priority : int, order : int) -> None:
+        self.event_type : int = event_type
+        self.action : EventAction = action
+        self.priority : int = priority
+        self.order : int = order
+        self.active : bool = True
+
+def get_dispatch_order(handle : EventHandle) -> tuple[int, int]:
+    return (-handle.priority, handle.order)
 
 class EventManger:
+    '''Calls the actions bound to the type of every processed event.
+    Actions with a higher priority are called first, actions with the same priority are called in the order they were bound.
+    An action can return EventManger.CONSUME to stop the event from reaching the actions after it.
+    Events of the types in coalesced_types are coalesced by process_events, see coalesce.'''
+    CONSUME = object()
+
     def __init__(self) -> None:
-        self.bound_actions : dict[int, list['function']] = {pygame.QUIT : [self.close_game]}
-    
+        self.quit_action : EventAction = self.close_game
+        self.handles : dict[int, dict[EventHandle, None]] = {}
+        self.action_handles : dict[int, dict[EventAction, list[EventHandle]]] = {}
+        self.dispatch_lists : dict[int, tuple[EventHandle, ...]] = {}
+        self.bind_count : int = 0
+        self.coalesced_types : set[int] = {pygame.MOUSEMOTION, pygame.FINGERMOTION}
+
     def close_game(self, event):
         pygame.quit()
         exit()
-    
-    def bind(self, event_type : int, actions : list['function'], duplicate = False):
-        '''The action parameter must be a function or list of functions that accepts exactly one pygame.Event argument. 
+
+    def connect(self, event_type : int, action : EventAction, priority : int = 0) -> EventHandle|None:
+        '''Binds a single action and returns its handle. Returns None for pygame.QUIT, which only calls quit_action.'''
+        if event_type == pygame.QUIT:
+            return None
+        handle = EventHandle(event_type, action, priority, self.bind_count)
+        self.bind_count += 1
+        self.handles.setdefault(event_type, {})[handle] = None
+        self.action_handles.setdefault(event_type, {}).setdefault(action, []).append(handle)
+        self.dispatch_lists.pop(event_type, None)
+        return handle
+
+    def disconnect(self, handle : EventHandle) -> bool:
+        '''Unbinds the action of handle. Returns False if it was already unbound.'''
+        if not handle.active: return False
+        handle.active = False
+        self.handles[handle.event_type].pop(handle)
+        action_handles = self.action_handles[handle.event_type]
+        same_action = action_handles[handle.action]
+        same_action.remove(handle)
+        if not same_action: action_handles.pop(handle.action)
+        self.dispatch_lists.pop(handle.event_type, None)
+        return True
+
+    def bind(self, event_type : int, actions : list['function'], duplicate = False, priority : int = 0):
+        '''The action parameter must be a function or list of functions that accepts exactly one pygame.Event argument.
         Returns False if the action fails to bind.'''
         try:
             actions[0]
@@ -19,14 +69,12 @@ class EventManger:
 
         if event_type == pygame.QUIT:
             return False
-        
-        if (event_type in self.bound_actions):
-            for action in actions:
-                if action not in self.bound_actions[event_type] or duplicate is True:
-                    self.bound_actions[event_type].append(action)
-        else:
-            self.bound_actions[event_type] = actions
-        
+
+        bound = self.action_handles.get(event_type, {})
+        for action in actions:
+            if action not in bound or duplicate is True:
+                self.connect(event_type, action, priority)
+
         return True
 
     def unbind(self, event_type : int, target_actions : list['function']):
@@ -39,26 +87,67 @@ class EventManger:
         if event_type == pygame.QUIT:
             return False
 
-        if event_type not in self.bound_actions:
+        if event_type not in self.handles:
             return False
-        
+
+        action_handles = self.action_handles[event_type]
         for action in target_actions:
-            if action in self.bound_actions[event_type]:
-                self.bound_actions[event_type].remove(action)
-                
+            if action in action_handles:
+                self.disconnect(action_handles[action][0])
+
         return True
-    
+
     def unbind_all(self, event_type : int):
         if event_type == pygame.QUIT:
             return False
 
-        if event_type not in self.bound_actions:
+        if event_type not in self.handles:
             return False
-        
-        self.bound_actions.pop(event_type)
+
+        for handle in self.handles.pop(event_type):
+            handle.active = False
+        self.action_handles.pop(event_type)
+        self.dispatch_lists.pop(event_type, None)
         return True
-    
+
+    def get_dispatch_list(self, event_type : int) -> tuple[EventHandle, ...]:
+        dispatch_list = self.dispatch_lists.get(event_type, None)
+        if dispatch_list is None:
+            dispatch_list = tuple(sorted(self.handles.get(event_type, ()), key=get_dispatch_order))
+            self.dispatch_lists[event_type] = dispatch_list
+        return dispatch_list
+
     def process_event(self, event : pygame.Event):
-        if event.type in self.bound_actions:
-            for callback in self.bound_actions[event.type]:
-                callback(event)
+        if event.type == pygame.QUIT:
+            self.quit_action(event)
+            return
+        #Actions unbound by an earlier action of the same event are skipped, actions bound by one wait for the next event
+        for handle in self.get_dispatch_list(event.type):
+            if handle.active and handle.action(event) is EventManger.CONSUME: return
+
+    def process_events(self, events : Iterable[pygame.Event]):
+        '''Processes every event of events in order, after coalescing them.'''
+        for event in self.coalesce(events):
+            self.process_event(event)
+
+    def coalesce(self, events : Iterable[pygame.Event]) -> list[pygame.Event]:
+        '''Drops every event of a coalesced type that is followed by another one of the same type (and finger for touch events)
+        with only coalesced events in between. The relative mouse motion of the dropped events is added to the one that is kept.'''
+        events = list(events)
+        if not self.coalesced_types: return events
+        kept : list[pygame.Event] = []
+        latest : dict[tuple, pygame.Event] = {}
+        for event in reversed(events):
+            if event.type not in self.coalesced_types:
+                latest.clear()
+                kept.append(event)
+                continue
+            key = (event.type, getattr(event, 'touch_id', None), getattr(event, 'finger_id', None))
+            later = latest.get(key, None)
+            if later is None:
+                latest[key] = event
+                kept.append(event)
+            elif event.type == pygame.MOUSEMOTION and hasattr(event, 'rel') and hasattr(later, 'rel'):
+                later.rel = (later.rel[0] + event.rel[0], later.rel[1] + event.rel[1])
+        kept.reverse()
+        return kept
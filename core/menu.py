@@ -9,9 +9,30 @@ import utils.tween_module as TweenModule
 import utils.interpolation as interpolation
 from utils.my_timer import Timer
 from utils.ui.brightness_overlay import BrightnessOverlay
+from utils.render_queue import RenderQueue, RenderList
+from utils.ui.stage_compositor import StageCompositor
 from math import floor
+from typing import Any
+
+class StageList(list):
+    '''Menu stages, built the first time they are accessed. Index 0 (no stage) is always None.
+    builders maps a stage number to a function returning the sprites of that stage.'''
+    def __init__(self, size : int, builders : dict[int, Callable[[], list[UiSprite]]]) -> None:
+        super().__init__([None] * size)
+        self.builders : dict[int, Callable[[], list[UiSprite]]] = builders
+
+    def __getitem__(self, index : int) -> RenderList|None:
+        stage = super().__getitem__(index)
+        if stage is None and index in self.builders:
+            stage = RenderList(self.builders.pop(index)())
+            super().__setitem__(index, stage)
+        return stage
+
+    def is_built(self, index : int) -> bool:
+        return super().__getitem__(index) is not None
 
 class BaseMenu:
+    USE_STAGE_COMPOSITOR : bool = True
     font_40 = pygame.font.Font(r'assets/fonts/Pixeltype.ttf', 40)
     font_50 = pygame.font.Font(r'assets/fonts/Pixeltype.ttf', 50)
     font_60 = pygame.font.Font(r'assets/fonts/Pixeltype.ttf', 60)
@@ -23,6 +44,10 @@ class BaseMenu:
         self.stages : list[list[UiSprite]]
         self.bg_color : ColorType
         self.temp : dict[UiSprite, Timer] = {}
+        self.temp_version : int = 0
+        self.render_queue : RenderQueue = RenderQueue()
+        self.render_signature : tuple|None = None
+        self.compositor : StageCompositor = StageCompositor()
         
     def init(self):
         self.bg_color = (94, 129, 162)
@@ -34,6 +59,7 @@ class BaseMenu:
         if element not in self.temp or override == True:
             timer = time if type(time) == Timer else Timer(time, time_source, time_scale)
             self.temp[element] = timer
+            self.temp_version += 1
     def alert_player(self, text : str, alert_speed : float = 1):
         text_sprite = TextSprite(pygame.Vector2(core_object.main_display.get_width() // 2, 90), 'midtop', 0, text, 
                         text_settings=(core_object.menu.font_60, 'White', False), text_stroke_settings=('Black', 2), colorkey=(0,255,0))
@@ -68,11 +94,27 @@ class BaseMenu:
         global core_object
         from core.core import core_object
 
+    def get_render_queue(self) -> RenderQueue:
+        '''Returns the zindex ordered sprites of the current stage and the temp sprites.
+        The queue is only rebuilt when the stage, its RenderList or the temp sprites change.'''
+        stage_list = self.stages[self.stage]
+        stage_version = stage_list.version if type(stage_list) == RenderList else None
+        signature = (self.stage, id(stage_list), stage_version, self.temp_version)
+        if stage_version is None or signature != self.render_signature:
+            self.render_queue = RenderQueue(stage_list + list(self.temp.keys()))
+            self.render_signature = signature
+        else:
+            self.render_queue.refresh()
+        return self.render_queue
+
     def render(self, display : pygame.Surface):
-        sprite_list = [sprite for sprite in (self.stages[self.stage] + list(self.temp.keys())) if sprite.visible == True]
-        sprite_list.sort(key = lambda sprite : sprite.zindex)
-        for sprite in sprite_list:
-            sprite.draw(display)
+        '''Fills display with bg_color and draws the current stage and the temp sprites.'''
+        if self.USE_STAGE_COMPOSITOR:
+            self.compositor.render(display, self.get_render_queue(), self.bg_color, self.temp)
+            return
+        display.fill(self.bg_color)
+        for sprite in self.get_render_queue():
+            if sprite.visible == True: sprite.draw(display)
         
     
     def update(self, delta : float):
@@ -82,6 +124,7 @@ class BaseMenu:
             item.update(delta)
         for item in to_del:
             self.temp.pop(item)
+        if to_del: self.temp_version += 1
 
         stage_data = self.stage_data[self.stage]
         for sprite in self.stages[self.stage]:
@@ -95,6 +138,7 @@ class BaseMenu:
         self.stage = 0
         self.remove_connections()
         self.temp.clear()
+        self.temp_version += 1
     
     def goto_stage(self, new_stage : int):
         self.stage = new_stage
@@ -224,12 +268,13 @@ class Menu(BaseMenu):
         self.stage = 1
         self.stage_data : list[dict] = [{} for _ in range(20 + 1)]
         self.stage_data[0] = None
+        self.stages = StageList(16, {stage : getattr(self, f'build_stage{stage}') for stage in range(1, 16)})
+        self.sprite_keys : dict[tuple[int, str], tuple[Any, UiSprite]] = {}
+    
+    def build_stage1(self) -> list[UiSprite]:
         window_size = core_object.main_display.get_size()
-        window_x, window_y = window_size
         centerx = window_size[0] // 2
-        upgrade_bar_surf1 = make_upgrade_bar()
-        self.stages = [None, 
-        [BaseUiElements.new_text_sprite('StormZ Day', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
+        return [BaseUiElements.new_text_sprite('StormZ Day', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Play', 1, 'midbottom', (centerx, window_size[1] - 15), (0.5, 1.4), 
         {'name' : 'play_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_button('BlueButton', 'Settings', 1, 'bottomleft', (15, window_size[1] - 15), (0.4, 1.0), 
@@ -239,10 +284,13 @@ class Menu(BaseMenu):
         BaseUiElements.new_text_sprite('WASD to move', (Menu.font_50, 'Black', False), 0, 'topright', (945, 140)),
         BaseUiElements.new_text_sprite('Hold space to shoot', (Menu.font_50, 'Black', False), 0, 'topright', (945, 200)),
         BaseUiElements.new_text_sprite('Mouse to aim', (Menu.font_50, 'Black', False), 0, 'topright', (945, 260)),
-        BaseUiElements.new_text_sprite('P to pause', (Menu.font_50, 'Black', False), 0, 'topright', (945, 320))], 
+        BaseUiElements.new_text_sprite('P to pause', (Menu.font_50, 'Black', False), 0, 'topright', (945, 320))]
 
-        #--> stage 2
-        [BaseUiElements.new_text_sprite('Loadout', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
+    def build_stage2(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        window_x, window_y = window_size
+        centerx = window_size[0] // 2
+        return [BaseUiElements.new_text_sprite('Loadout', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         UiSprite(Menu.token_image, Menu.token_image.get_rect(topright = (955, 15)), 0, 'token_image'),
         TextSprite(pygame.Vector2(903, 40), 'midright', 0, '3', 'token_count', None, None, 0, (Menu.font_50, 'White', False), ('Black', 2), colorkey=[0,255,0]),
         BaseUiElements.new_text_sprite('Weapon Equipped : Pistol', (Menu.font_50, 'Black', False), 0, 'midleft', (15, 100), name='weapon_equipped'),
@@ -259,10 +307,12 @@ class Menu(BaseMenu):
         {'name' : 'shop_button', 'visible' : False}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_button('BlueButton', 'Armory', 4, 'midbottom', (centerx + 90, window_y - 15), (0.4, 1.0), 
         {'name' : 'armory_button', 'visible' : False}, (Menu.font_40, 'Black', False)),
-        ],
+        ]
 
-        #--> stage 3
-        [BaseUiElements.new_text_sprite('Weapons', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
+    def build_stage3(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [BaseUiElements.new_text_sprite('Weapons', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         #BaseUiElements.new_button('GreenButton', 'Ready', 1, 'bottomright', (940, window_size[1] - 15), (0.4, 1.0), 
         #{'name' : 'ready_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
@@ -277,9 +327,12 @@ class Menu(BaseMenu):
         *self.make_weapon_ui('Rifle', (345, 110), 'Shoots quickly.'), 
         *self.make_weapon_ui('Shotgun', (590, 110), 'Shoots multiple pellets at once, dealing big damage.'), 
         *self.make_weapon_ui('Piercer', (835, 110), 'Bullets go trough enemies. Useful when enemies start to stack.')
-        ],
-        #--> stage 4
-        [BaseUiElements.new_text_sprite('Results', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
+        ]
+
+    def build_stage4(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [BaseUiElements.new_text_sprite('Results', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Next', 1, 'midbottom', (centerx, window_size[1] - 15), (0.35, 1), 
         {'name' : 'next_button'}, (Menu.font_40, 'Black', False)),
         TextSprite(pygame.Vector2(centerx, 90), 'midtop', 0, 'Wave:', 'wave_title', None, None, 0, (Menu.font_50, 'Black', False), colorkey=[0,255,0]),
@@ -291,9 +344,12 @@ class Menu(BaseMenu):
         TextSprite(pygame.Vector2(centerx, 310), 'midtop', 0, 'Tokens Gained:', 'token_title', None, None, 0, (Menu.font_50, 'Black', False), colorkey=[0,255,0]),
         TextSprite(pygame.Vector2(centerx, 340), 'midtop', 0, '0', 'token_count', None, None, 0, (Menu.font_50, 'Black', False), colorkey=[0,255,0]),
         TextSprite(pygame.Vector2(centerx, 390), 'midtop', 0, 'Current Token Count : 0', 'current_token_count', None, None, 0, (Menu.font_50, 'Black', False), colorkey=[0,255,0]),
-        ],
-        #--> stage 5
-        [BaseUiElements.new_text_sprite('Armors', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
+        ]
+
+    def build_stage5(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [BaseUiElements.new_text_sprite('Armors', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         #BaseUiElements.new_button('GreenButton', 'Ready', 1, 'bottomright', (940, window_size[1] - 15), (0.4, 1.0), 
         #{'name' : 'ready_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
@@ -308,9 +364,12 @@ class Menu(BaseMenu):
         *self.make_armor_ui('Adaptative', (835, 110), 
 '''Completely negates all damage while active, but falls apart
 very quickly if you get overwhelmed.
-Useful for skilled players.''')],
-        #--> stage 6
-        [
+Useful for skilled players.''')]
+
+    def build_stage6(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Settings', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_text_sprite('Current control scheme : Simple', (Menu.font_50, 'Black', False), 0, 'topleft', (15, 90), name='scheme_title'),
         BaseUiElements.new_button('BlueButton', 'Choose', 1, 'topleft', (15, 140), (0.4, 1.0), 
@@ -323,25 +382,35 @@ Useful for skilled players.''')],
         BaseUiElements.new_text_sprite('Current joystick size : Medium', (Menu.font_50, 'Black', False), 0, 'topleft', (15, 240), name='joy_size'),
         BaseUiElements.new_button('BlueButton', 'Edit', 1, 'topleft', (15, 290), (0.4, 1.0), 
         {'name' : 'choose_joystick_size'}, (Menu.font_40, 'Black', False)),
-        ],
-        #--> stage 7
-        [
+        ]
+
+    def build_stage7(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Choose control scheme', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         *self.make_control_scheme_ui('Mobile', (100, 200), 'Use this if you are playing on mobile or on a touchscreen.'),
         *self.make_control_scheme_ui('Simple', (345, 200), 'Shots will automatically go to the nearest enemy.\nUse the mouse or the arrow keys to aim manually.'),
         *self.make_control_scheme_ui('Mixed', (590, 200), 'Aim with the arrow keys when using SPACE to shoot.\nAim using the mouse when clicking to shoot.'), 
         *self.make_control_scheme_ui('Expert', (835, 200), 'Aim with the mouse.\nRecommended for more experienced players.')
-        ],
-        #--> stage 8
-        [
+        ]
+
+    def build_stage8(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Are you sure? This action is irreversible.', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'midleft', (200, 200), (0.4, 1.0), 
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_button('RedButton', 'RESET', 1, 'midright', (740, 200), (0.4, 1.0), 
         {'name' : 'reset_button'}, (Menu.font_40, 'Black', False)),
-        ],
-        #--> stage 9
-        [
+        ]
+
+    def build_stage9(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        window_x, window_y = window_size
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Shop', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_text_sprite('Weapons', (Menu.font_50, 'Black', False), 0, 'midtop', (225, 140)),
         BaseUiElements.new_button('BlueButton', 'Browse', 1, 'midtop', (225, 200), (0.4, 1.0), name='weapon_browse'),
@@ -351,9 +420,13 @@ Useful for skilled players.''')],
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
         UiSprite(Menu.token_image, Menu.token_image.get_rect(topright = (955, 15)), 0, 'token_image'),
         TextSprite(pygame.Vector2(903, 40), 'midright', 0, '3', 'token_count', None, None, 0, (Menu.font_50, 'White', False), ('Black', 2), colorkey=[0,255,0]),
-        ],
-        #--> stage 10
-        [
+        ]
+
+    def build_stage10(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        window_x, window_y = window_size
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Armory', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_text_sprite('Weapons', (Menu.font_50, 'Black', False), 0, 'midtop', (225, 140)),
         BaseUiElements.new_button('BlueButton', 'Browse', 1, 'midtop', (225, 200), (0.4, 1.0), name='weapon_browse'),
@@ -363,9 +436,13 @@ Useful for skilled players.''')],
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
         UiSprite(Menu.token_image, Menu.token_image.get_rect(topright = (955, 15)), 0, 'token_image'),
         TextSprite(pygame.Vector2(903, 40), 'midright', 0, '3', 'token_count', None, None, 0, (Menu.font_50, 'White', False), ('Black', 2), colorkey=[0,255,0]),
-        ],
-        #--> stage 11
-        [
+        ]
+
+    def build_stage11(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        window_x, window_y = window_size
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Armory-Weapons', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
@@ -381,17 +458,24 @@ Useful for skilled players.''')],
         {'name' : 'upgrade_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_text_sprite("Cost : 0", (Menu.font_40, 'Black', False), 0, 'midbottom', (centerx + 90, window_y - 15), name='cost_sprite')
         
-        ],
-        #--> stage 12
-        [
+        ]
+
+    def build_stage12(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Upgrade Weapon', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
         UiSprite(Menu.token_image, Menu.token_image.get_rect(topright = (955, 15)), 0, 'token_image'),
         TextSprite(pygame.Vector2(903, 40), 'midright', 0, '3', 'token_count', None, None, 0, (Menu.font_50, 'White', False), ('Black', 2), colorkey=[0,255,0]),
-        ],
-        #--> stage 13
-        [
+        ]
+
+    def build_stage13(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        window_x, window_y = window_size
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Armory-Armor', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
@@ -406,24 +490,30 @@ Useful for skilled players.''')],
         BaseUiElements.new_button('BlueButton', 'Upgrade', 1, 'midbottom', (centerx + 90, window_y - 15), (0.4, 1.0), 
         {'name' : 'upgrade_button'}, (Menu.font_40, 'Black', False)),
         BaseUiElements.new_text_sprite("Cost : 0", (Menu.font_40, 'Black', False), 0, 'midbottom', (centerx + 90, window_y - 15), name='cost_sprite')
-        ],
-        #--> stage 14
-        [
+        ]
+
+    def build_stage14(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Upgrade Armor', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         BaseUiElements.new_button('BlueButton', 'Back', 1, 'topleft', (15, 10), (0.4, 1.0), 
         {'name' : 'back_button'}, (Menu.font_40, 'Black', False)),
         UiSprite(Menu.token_image, Menu.token_image.get_rect(topright = (955, 15)), 0, 'token_image'),
         TextSprite(pygame.Vector2(903, 40), 'midright', 0, '3', 'token_count', None, None, 0, (Menu.font_50, 'White', False), ('Black', 2), colorkey=[0,255,0]),
-        ],
-        #--> stage 15
-        [
+        ]
+
+    def build_stage15(self) -> list[UiSprite]:
+        window_size = core_object.main_display.get_size()
+        centerx = window_size[0] // 2
+        return [
         BaseUiElements.new_text_sprite('Choose joystick size', (Menu.font_60, 'Black', False), 0, 'midtop', (centerx, 25)),
         *self.make_control_scheme_ui('Small', (100, 200), 'Enables the small joysticks.'),
         *self.make_control_scheme_ui('Medium', (467, 200), 'Enables the medium joysticks.'),
         *self.make_control_scheme_ui('Large', (835, 200), 'Enables the large joysticks.'), 
         #*self.make_control_scheme_ui('Expert', (835, 200), 'Aim with the mouse.\nRecommended for more experienced players.')
-        ],
         ]
+
     
     def enter_stage1(self):
         self.stage = 1
@@ -432,20 +522,30 @@ Useful for skilled players.''')],
     def update_highscores_stage1(self):
         new_highscore_text : str = f'Highscore : {core_object.storage.high_score}'
         new_highwave_text : str = f'Highest wave : {core_object.storage.high_wave}'
-        new_score_sprite : UiSprite = BaseUiElements.new_text_sprite(new_highscore_text, (Menu.font_50, 'Black', False), 0, 'topleft', (15, 200),name='highscore_text')
-        new_wave_sprite : UiSprite = BaseUiElements.new_text_sprite(new_highwave_text, (Menu.font_50, 'Black', False), 0, 'topleft', (15, 260), name='highwave_text')
-        self.find_and_replace(new_score_sprite, 1, name='highscore_text')
-        self.find_and_replace(new_wave_sprite, 1, name='highwave_text')
+        self.refresh_sprite(1, 'highscore_text', new_highscore_text, lambda : BaseUiElements.new_text_sprite(new_highscore_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                         'topleft', (15, 200),name='highscore_text'))
+        self.refresh_sprite(1, 'highwave_text', new_highwave_text, lambda : BaseUiElements.new_text_sprite(new_highwave_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                       'topleft', (15, 260), name='highwave_text'))
+
+    def refresh_sprite(self, stage : int, name : str, key : Any, make_sprite : Callable[[], UiSprite]) -> bool:
+        '''Replaces the sprite called name in stage with make_sprite(), unless the sprite made last time for the same key is still there.
+        key should contain everything the sprite shows, so sprites are only rebuilt when the data behind them changed.'''
+        cached : tuple[Any, UiSprite]|None = self.sprite_keys.get((stage, name), None)
+        if cached is not None and cached[0] == key and self.get_sprite_by_name(stage, name) is cached[1]: return False
+        new_sprite : UiSprite = make_sprite()
+        self.find_and_replace(new_sprite, stage, name=name)
+        self.sprite_keys[(stage, name)] = (key, new_sprite)
+        return True
 
     def enter_stage2(self):
         self.stage = 2
-        new_sprite1 : UiSprite = BaseUiElements.new_text_sprite(f'Weapon Equipped : {core_object.storage.weapon_equipped}', (Menu.font_50, 'Black', False), 0, 
-                                                                'midleft', (15, 100), name='weapon_equipped')
-        self.find_and_replace(new_sprite1, 2, name='weapon_equipped')
+        weapon_text : str = f'Weapon Equipped : {core_object.storage.weapon_equipped}'
+        self.refresh_sprite(2, 'weapon_equipped', weapon_text, lambda : BaseUiElements.new_text_sprite(weapon_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                       'midleft', (15, 100), name='weapon_equipped'))
         armor_equipped : str = 'None' if core_object.storage.armor_equipped is None else core_object.storage.armor_equipped
-        new_sprite2 : UiSprite = BaseUiElements.new_text_sprite(f'Armor Equipped : {armor_equipped}', (Menu.font_50, 'Black', False), 0, 
-                                                                'midleft', (15, 295), name='armor_equipped')
-        self.find_and_replace(new_sprite2, 2, name='armor_equipped')
+        armor_text : str = f'Armor Equipped : {armor_equipped}'
+        self.refresh_sprite(2, 'armor_equipped', armor_text, lambda : BaseUiElements.new_text_sprite(armor_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                     'midleft', (15, 295), name='armor_equipped'))
         self.update_token_count(self.stage)
 
     def update_token_count(self, current_stage : int = 2):
@@ -473,9 +573,9 @@ Useful for skilled players.''')],
             interact_text = 'Equip'
         else:
             interact_text = 'Equipped'
-        new_weapon_interact = BaseUiElements.new_button('BlueButton', interact_text, 1, 'midtop', (midtop[0], midtop[1] + 60), 
-                                                        (0.4, 1),name=f'weapon_interact_{weapon_name}')
-        self.find_and_replace(new_weapon_interact, self.stage, name=f'weapon_interact_{weapon_name}')
+        self.refresh_sprite(self.stage, f'weapon_interact_{weapon_name}', (interact_text, midtop), 
+                            lambda : BaseUiElements.new_button('BlueButton', interact_text, 1, 'midtop', (midtop[0], midtop[1] + 60), 
+                                                               (0.4, 1),name=f'weapon_interact_{weapon_name}'))
 
     def make_armor_ui(self, armor_name : str, midtop : tuple[int, int]|pygame.Vector2, tooltip : str) -> tuple[UiSprite]:
         armor_title_text = f'{armor_name}\nCost : {core_object.storage.COST_TABLE['Armors'][armor_name]}'
@@ -497,9 +597,9 @@ Useful for skilled players.''')],
             interact_text = 'Equip'
         else:
             interact_text = 'Unequip'
-        new_armor_interact = BaseUiElements.new_button('BlueButton', interact_text, 1, 'midtop', (midtop[0], midtop[1] + 60), 
-                                                        (0.4, 1),name=f'armor_interact_{armor_name}')
-        self.find_and_replace(new_armor_interact, self.stage, name=f'armor_interact_{armor_name}')
+        self.refresh_sprite(self.stage, f'armor_interact_{armor_name}', (interact_text, midtop), 
+                            lambda : BaseUiElements.new_button('BlueButton', interact_text, 1, 'midtop', (midtop[0], midtop[1] + 60), 
+                                                               (0.4, 1),name=f'armor_interact_{armor_name}'))
     
     def make_control_scheme_ui(self, name : str, midtop : pygame.Vector2|tuple[int, int], tooltip : str ) -> tuple[UiSprite, UiSprite]:
         button = BaseUiElements.new_button('BlueButton', name, 1, 'midtop', midtop, (0.4, 1.0), 
@@ -562,12 +662,12 @@ Useful for skilled players.''')],
     
     def enter_stage6(self):
         self.stage = 6
-        text_sprite = BaseUiElements.new_text_sprite(f'Current control scheme : {core_object.settings.info['ControlMethod']}', 
-                                                     (Menu.font_50, 'Black', False), 0, 'topleft', (15, 90), name='scheme_title')
-        self.find_and_replace(text_sprite, 6, name='scheme_title')
-        text_sprite2 = BaseUiElements.new_text_sprite(f'Current joystick size : {core_object.settings.info['JoystickSize']}', 
-                                                     (Menu.font_50, 'Black', False), 0, 'topleft', (15, 240), name='joy_size')
-        self.find_and_replace(text_sprite2, 6, name='joy_size')
+        scheme_text : str = f'Current control scheme : {core_object.settings.info['ControlMethod']}'
+        self.refresh_sprite(6, 'scheme_title', scheme_text, lambda : BaseUiElements.new_text_sprite(scheme_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                    'topleft', (15, 90), name='scheme_title'))
+        joystick_text : str = f'Current joystick size : {core_object.settings.info['JoystickSize']}'
+        self.refresh_sprite(6, 'joy_size', joystick_text, lambda : BaseUiElements.new_text_sprite(joystick_text, (Menu.font_50, 'Black', False), 0, 
+                                                                                                  'topleft', (15, 240), name='joy_size'))
     
     def enter_stage7(self):
         self.stage_data[7]['prev_stage'] = self.stage
@@ -667,13 +767,12 @@ Useful for skilled players.''')],
             new_text = 'Buy'
             self.get_sprite_by_name(11, 'upgrade_button').visible = False
             cost_visible = True
-        new_sprite : UiSprite = BaseUiElements.new_button('BlueButton', new_text, 1, 'midbottom', (centerx - 90, window_size[1] - 15), (0.4, 1.0), 
-        {'name' : 'weapon_interact'}, (Menu.font_40, 'Black', False))
-        self.find_and_replace(new_sprite, 11, name='weapon_interact')
-        cost_sprite = BaseUiElements.new_text_sprite(f"Cost : {cost}", (Menu.font_50, 'Black', False), 0, 
-                                                     'bottomleft', (centerx + 22, window_y - 30), name='cost_sprite')
-        cost_sprite.visible = cost_visible
-        self.find_and_replace(cost_sprite, 11, name='cost_sprite')
+        self.refresh_sprite(11, 'weapon_interact', new_text, 
+                            lambda : BaseUiElements.new_button('BlueButton', new_text, 1, 'midbottom', (centerx - 90, window_size[1] - 15), (0.4, 1.0), 
+                                                               {'name' : 'weapon_interact'}, (Menu.font_40, 'Black', False)))
+        self.refresh_sprite(11, 'cost_sprite', cost, lambda : BaseUiElements.new_text_sprite(f"Cost : {cost}", (Menu.font_50, 'Black', False), 0, 
+                                                                                             'bottomleft', (centerx + 22, window_y - 30), name='cost_sprite'))
+        self.get_sprite_by_name(11, 'cost_sprite').visible = cost_visible
     
     def exit_stage11(self):
         self.remove_stage11_weapon_ui(self.stage_data[11]['current_weapon'])
@@ -837,13 +936,12 @@ Useful for skilled players.''')],
             new_text = 'Buy'
             self.get_sprite_by_name(13, 'upgrade_button').visible = False
             cost_visible = True
-        new_sprite : UiSprite = BaseUiElements.new_button('BlueButton', new_text, 1, 'midbottom', (centerx - 90, window_size[1] - 15), (0.4, 1.0), 
-        {'name' : 'armor_interact'}, (Menu.font_40, 'Black', False))
-        self.find_and_replace(new_sprite, 13, name='armor_interact')
-        cost_sprite = BaseUiElements.new_text_sprite(f"Cost : {cost}", (Menu.font_50, 'Black', False), 0, 
-                                                     'bottomleft', (centerx + 22, window_y - 30), name='cost_sprite')
-        cost_sprite.visible = cost_visible
-        self.find_and_replace(cost_sprite, 13, name='cost_sprite')
+        self.refresh_sprite(13, 'armor_interact', new_text, 
+                            lambda : BaseUiElements.new_button('BlueButton', new_text, 1, 'midbottom', (centerx - 90, window_size[1] - 15), (0.4, 1.0), 
+                                                               {'name' : 'armor_interact'}, (Menu.font_40, 'Black', False)))
+        self.refresh_sprite(13, 'cost_sprite', cost, lambda : BaseUiElements.new_text_sprite(f"Cost : {cost}", (Menu.font_50, 'Black', False), 0, 
+                                                                                             'bottomleft', (centerx + 22, window_y - 30), name='cost_sprite'))
+        self.get_sprite_by_name(13, 'cost_sprite').visible = cost_visible
     
     def exit_stage13(self):
         self.remove_stage13_armor_ui(self.stage_data[13]['current_armor'])
@@ -0,0 +1,45 @@
+import pygame
+
+class PostProcessStep:
+    '''Base class for effects applied to the display after everything has been drawn.
+    Steps are applied in order by Core.apply_post_process.'''
+    def __init__(self) -> None:
+        self.enabled : bool = True
+
+    def is_active(self) -> bool:
+        return self.enabled
+
+    def apply(self, display : pygame.Surface, rects : list[pygame.Rect]|None = None):
+        '''Applies the effect to the whole display, or only to rects if they are given.'''
+        pass
+
+class BrightnessStep(PostProcessStep):
+    '''Brightens or darkens the display by adding or subtracting a flat color.
+    Uses Surface.fill with a blend flag, so no surface has to be kept around.'''
+    def __init__(self, brightness : int = 0) -> None:
+        super().__init__()
+        self._brightness : int
+        self.color : tuple[int, int, int]
+        self.blend_mode : int
+        self.brightness = brightness
+
+    @property
+    def brightness(self) -> int:
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, new_val : int):
+        self._brightness = new_val
+        abs_brightness = min(abs(new_val), 255)
+        self.color = (abs_brightness, abs_brightness, abs_brightness)
+        self.blend_mode = pygame.BLEND_RGB_ADD if new_val >= 0 else pygame.BLEND_RGB_SUB
+
+    def is_active(self) -> bool:
+        return self.enabled and self._brightness != 0
+
+    def apply(self, display : pygame.Surface, rects : list[pygame.Rect]|None = None):
+        if not rects:
+            display.fill(self.color, special_flags=self.blend_mode)
+            return
+        for rect in rects:
+            display.fill(self.color, rect, special_flags=self.blend_mode)
@@ -1,46 +1,132 @@
 from utils.my_timer import Timer
 from typing import Callable
 from utils.helpers import Task
+from heapq import heappush, heappop
+from itertools import count
+
+TimeType = float|tuple[float, Callable[[], float], float]
+
+class TaskHandle:
+    '''Returned when scheduling a task. Can be used to cancel it.'''
+    def __init__(self, task : Task, time_source : Callable[[], float], scale_factor : float, duration : float,
+                 order : int, repetitions : int = 0) -> None:
+        self.task : Task = task
+        self.time_source : Callable[[], float] = time_source
+        self.scale_factor : float = scale_factor
+        self.duration : float = duration
+        self.start_time : float = time_source() * scale_factor
+        self.order : int = order
+        self.repetitions : int = repetitions
+        self.cancelled : bool = False
+        self.done : bool = False
+
+    @property
+    def deadline(self) -> float:
+        return self.start_time + self.duration
+
+    def get_time(self) -> float:
+        return self.time_source() * self.scale_factor - self.start_time
+
+    def isover(self) -> bool:
+        '''Same rule as Timer.isover: never over if the duration is below 0.'''
+        if self.duration < 0: return False
+        return self.get_time() > self.duration
+
+    def cancel(self):
+        self.cancelled = True
+
+    def is_pending(self) -> bool:
+        return not (self.cancelled or self.done)
 
 class TaskScheduler:
+    '''Runs callbacks once a duration has passed on a time source (the global timer by default).
+    Delayed tasks are kept in one min-heap of deadlines per (time source, scale factor), so each update only
+    reads every time source once and pops the tasks that are due. Tasks due on the same update run in scheduling order.'''
     def __init__(self) -> None:
-        self.scheduled_tasks : dict[Task, Timer] = {}
-        self.continous_tasks : dict[Task, Timer] = {}
+        self.heaps : dict[tuple[Callable[[], float], float], list[tuple[float, int, TaskHandle]]] = {}
+        self.continous_tasks : dict[TaskHandle, None] = {}
+        self.counter = count()
 
-    def schedule_task(self, time : float|tuple[float, Callable[[], float], float], callback : Callable, *args, **kwargs):
+    def _make_handle(self, time : TimeType, callback : Callable, args : tuple, kwargs : dict, repetitions : int = 0) -> TaskHandle:
         new_task = Task(callback, *args, **kwargs)
-        t = type(time)
-        if (t == int) or t == (float):
-            self.scheduled_tasks[new_task] = Timer(time)
-        else:
-            self.scheduled_tasks[new_task] = Timer(time[0], time[1], time[2])
-        return new_task
-    
-    def schedule_continuous_task(self, time : float|tuple[float, Callable[[], float], float], callback : Callable, *args, **kwargs):
-        new_task = Task(callback, *args, **kwargs)
-        t = type(time)
-        if t == int or float:
-            self.continous_tasks[new_task] = Timer(time)
-        else:
-            self.continous_tasks[new_task] = Timer(time[0], time[1], time[2])
-        return new_task
-    
+        if type(time) in (int, float):
+            return TaskHandle(new_task, Timer.time_source, 1, time, next(self.counter), repetitions)
+        return TaskHandle(new_task, time[1], time[2], time[0], next(self.counter), repetitions)
+
+    def _push(self, handle : TaskHandle):
+        if handle.duration < 0: return
+        key = (handle.time_source, handle.scale_factor)
+        heap = self.heaps.get(key, None)
+        if heap is None:
+            heap = []
+            self.heaps[key] = heap
+        heappush(heap, (handle.deadline, handle.order, handle))
+
+    def schedule_task(self, time : TimeType, callback : Callable, *args, **kwargs) -> TaskHandle:
+        '''Calls callback once after time has passed. Time is either a duration in seconds of the global timer,
+        or a (duration, time_source, scale_factor) tuple.'''
+        handle = self._make_handle(time, callback, args, kwargs)
+        self._push(handle)
+        return handle
+
+    def schedule_repeating_task(self, time : TimeType, repetitions : int, callback : Callable, *args, **kwargs) -> TaskHandle:
+        '''Calls callback every time the duration passes, repetitions times. A negative repetitions count repeats until cancelled.'''
+        handle = self._make_handle(time, callback, args, kwargs, repetitions)
+        if repetitions == 0:
+            handle.done = True
+            return handle
+        self._push(handle)
+        return handle
+
+    def schedule_continuous_task(self, time : TimeType, callback : Callable, *args, **kwargs) -> TaskHandle:
+        '''Calls callback on every update until time has passed. A negative duration runs it until cancelled.'''
+        handle = self._make_handle(time, callback, args, kwargs)
+        self.continous_tasks[handle] = None
+        return handle
+
+    def cancel(self, handle : TaskHandle):
+        handle.cancel()
+        self.continous_tasks.pop(handle, None)
+
+    def clear(self):
+        for heap in self.heaps.values():
+            for _, _, handle in heap: handle.cancel()
+        for handle in self.continous_tasks: handle.cancel()
+        self.heaps.clear()
+        self.continous_tasks.clear()
+
+    def get_due_tasks(self) -> list[TaskHandle]:
+        due : list[TaskHandle] = []
+        for key in list(self.heaps):
+            heap = self.heaps[key]
+            time_source, scale_factor = key
+            now = time_source() * scale_factor
+            while heap:
+                handle = heap[0][2]
+                if not handle.cancelled and now - handle.start_time <= handle.duration: break
+                heappop(heap)
+                if not handle.cancelled: due.append(handle)
+            if not heap: self.heaps.pop(key)
+        due.sort(key = lambda handle : handle.order)
+        return due
+
     def update(self):
-        to_remove = []
-        for task in self.scheduled_tasks:
-            if self.scheduled_tasks[task].isover():
-                task.execute()
-                to_remove.append(task)
-        
-        for task in to_remove:
-            self.scheduled_tasks.pop(task)
-
-        to_remove.clear()
-
-        for task in self.continous_tasks:
-            task.execute()
-            if self.continous_tasks[task].isover():
-                to_remove
-
-        for task in to_remove:
-            self.continous_tasks.pop(task)
\ No newline at end of file
+        for handle in self.get_due_tasks():
+            if handle.cancelled: continue
+            handle.task.execute()
+            if handle.repetitions == 0 or handle.repetitions == 1:
+                handle.done = True
+                continue
+            if handle.repetitions > 0: handle.repetitions -= 1
+            handle.start_time += handle.duration
+            handle.order = next(self.counter)
+            self._push(handle)
+
+        for handle in list(self.continous_tasks):
+            if handle.cancelled:
+                self.continous_tasks.pop(handle, None)
+                continue
+            handle.task.execute()
+            if handle.isover():
+                handle.done = True
+                self.continous_tasks.pop(handle, None)
@@ -3,76 +3,130 @@ from utils.ui.ui_sprite import UiSprite
 from utils.ui.base_ui_elements import BaseUiElements
 from utils.my_timer import Timer
 from typing import Callable
+from utils.render_queue import RenderQueue
 
 class Ui:
+    '''Ui elements, indexed by identity, name and tag so adding, removing and looking them up does not scan every element.
+    complete_list holds every element drawn (permanent and temporary) in zindex order.
+    Element names and tags are read when an element enters the render queue, so they should not change while it is in this Ui.'''
     def __init__(self, elements : list[UiSprite] = None) -> None:
-        if elements is None: elements = []
-        self.elements : list[UiSprite] = elements
+        self.elements : dict[UiSprite, int] = {}
         self.temp_elements : dict[UiSprite, Timer] = {}
-        self.complete_list : list[UiSprite] = []
+        self.complete_list : RenderQueue = RenderQueue()
+        self.queued : dict[UiSprite, int] = {}
+        self.index_keys : dict[UiSprite, tuple[str|None, int]] = {}
+        self.names : dict[str, dict[UiSprite, None]] = {}
+        self.tags : dict[int, dict[UiSprite, None]] = {}
+        if elements: self.add_multiple(elements, duplicate=True)
+    
+    def _queue(self, element : UiSprite):
+        self.complete_list.add(element)
+        count : int = self.queued.get(element, 0)
+        self.queued[element] = count + 1
+        if count: return
+        name, tag = element.name, element.tag
+        self.index_keys[element] = (name, tag)
+        if name is not None: self.names.setdefault(name, {})[element] = None
+        self.tags.setdefault(tag, {})[element] = None
+    
+    def _unqueue(self, element : UiSprite):
+        count : int = self.queued.get(element, 0)
+        if not count: return
+        self.complete_list.discard(element)
+        if count > 1:
+            self.queued[element] = count - 1
+            return
+        self.queued.pop(element)
+        name, tag = self.index_keys.pop(element)
+        if name is not None: self._unindex(self.names, name, element)
+        self._unindex(self.tags, tag, element)
+    
+    @staticmethod
+    def _unindex(index : dict, key, element : UiSprite):
+        bucket : dict[UiSprite, None] = index[key]
+        bucket.pop(element)
+        if not bucket: index.pop(key)
+    
+    def _get_matches(self, name : str|None, tag : int|None) -> list[UiSprite]:
+        matches : dict[UiSprite, None] = {}
+        if name is not None: matches.update(self.names.get(name, {}))
+        if tag is not None: matches.update(self.tags.get(tag, {}))
+        return list(matches)
     
     def get_sprite(self, name : str|None = None, tag : int|None = None) -> UiSprite|None:
+        '''Returns the first element in draw order with this name or this tag.'''
+        matches = self._get_matches(name, tag)
+        if not matches: return None
+        if len(matches) == 1: return matches[0]
         for element in self.complete_list:
-            if name is not None:
-                if element.name == name:
-                    return element
-            if tag is not None:
-                if element.tag == tag:
-                    return element
+            if element in matches: return element
     
     def get_sprites(self, name : str|None = None, tag : int|None = None) -> list[UiSprite]:
+        '''Returns every element with this name or this tag, in draw order.'''
+        matches = self._get_matches(name, tag)
+        if not matches: return []
+        if len(matches) == 1 and self.queued[matches[0]] == 1: return matches
+        named : dict[UiSprite, None] = self.names.get(name, {}) if name is not None else {}
         return_list = []
         for element in self.complete_list:
-            if name is not None:
-                if element.name == name:
-                    return_list.append(element)
-            if tag is not None:
-                if element.tag == tag:
-                    if element not in return_list: return_list.append(element)
-        
+            if element in named:
+                return_list.append(element)
+            elif element in matches:
+                if element not in return_list: return_list.append(element)
         return return_list
 
     def render(self, display : pygame.Surface):
-        
-        self.complete_list.sort(key = lambda ui_sprite : ui_sprite.zindex)
+        self.complete_list.refresh()
         for element in self.complete_list:
             element.draw(display)
-        #print(self.complete_list, self.elements, self.temp_elements)
     
     def add(self, element : UiSprite, duplicate = False):
-        if element not in self.elements or duplicate == True:
-            self.elements.append(element)
-            self.complete_list.append(element)
+        count : int = self.elements.get(element, 0)
+        if not count or duplicate == True:
+            self.elements[element] = count + 1
+            self._queue(element)
     
     def add_multiple(self, elements : list[UiSprite], duplicate = False):
         for element in elements:
             self.add(element, duplicate=duplicate)
 
     def remove(self, element : UiSprite, remove_all_instances = False):
-        if remove_all_instances == False:
-            if element in self.elements: 
-                self.elements.remove(element)
-                if element in self.temp_elements: self.temp_elements.pop(element)
-                if element in self.complete_list: self.complete_list.remove(element)
-        else:
-            to_del = []
-            for sprite in self.elements:
-                if sprite == element: to_del.append(element)
-            for item in to_del:
-                self.elements.remove(item)
-                if item in self.temp_elements: self.temp_elements.pop(item)
-                if element in self.complete_list: self.complete_list.remove(item)
+        count : int = self.elements.get(element, 0)
+        if not count: return
+        removed : int = count if remove_all_instances else 1
+        if removed == count: self.elements.pop(element)
+        else: self.elements[element] = count - removed
+        if element in self.temp_elements: self.temp_elements.pop(element)
+        for _ in range(removed):
+            self._unqueue(element)
+    
+    def __contains__(self, element : UiSprite) -> bool:
+        return element in self.queued
+    
+    def update_element(self, element : UiSprite, surf : pygame.Surface|None = None, rect : pygame.Rect|None = None,
+                       center : tuple[int, int]|None = None, visible : bool|None = None):
+        '''Changes a persistent element in place. It keeps its place in the render queue, so nothing is removed or re-added.
+        Hide elements that are only needed some of the time with visible=False instead of removing them.'''
+        if surf is not None: element.surf = surf
+        if rect is not None: element.rect = rect
+        if center is not None: element.rect.center = center
+        if rect is not None or center is not None: element._position = pygame.Vector2(element.rect.center)
+        if visible is not None: element.visible = visible
     
     def clear_all(self):
         self.elements.clear()
         self.temp_elements.clear()
         self.complete_list.clear()
+        self.queued.clear()
+        self.index_keys.clear()
+        self.names.clear()
+        self.tags.clear()
     
     def add_temp(self, element : UiSprite, time : float|Timer, override = False, time_source : Callable[[], float]|None = None, time_scale : float = 1):
         if element not in self.temp_elements or override == True:
             timer = time if type(time) == Timer else Timer(time, time_source, time_scale)
             self.temp_elements[element] = timer
-            self.complete_list.append(element)
+            self._queue(element)
     
     def update(self):
         to_del = []
@@ -80,7 +134,4 @@ class Ui:
             if self.temp_elements[item].isover(): to_del.append(item)
         for item in to_del:
             self.temp_elements.pop(item)
-            if item in self.complete_list: self.complete_list.remove(item)
-
-    
-    
\ No newline at end of file
+            self._unqueue(item)
@@ -1,12 +1,13 @@
 import pygame
 from core.core import core_object
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 
 class Background(Sprite):
     screen_size = core_object.main_display.get_size()
     screen_center = (screen_size[0] // 2, screen_size[1] // 2)
-    active_elements : list['Background'] = []
-    inactive_elements : list['Background']  = []
+    active_elements : PoolList['Background'] = PoolList()
+    inactive_elements : PoolList['Background'] = PoolList()
     areas : dict[int, pygame.Surface] = {}
     areas[0] = pygame.Surface(screen_size)
     areas[0].fill((94,129,162))
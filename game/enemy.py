@@ -1,14 +1,19 @@
 import pygame
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 from core.core import core_object
 from utils.pivot_2d import Pivot2D
 from game.projectiles import BaseProjectile, PeirceProjectile
 from utils.helpers import load_alpha_to_colorkey, scale_surf, tuple_vec_average, make_circle
 from utils.ui.textsprite import TextSprite
+from utils.clustering import find_clusters
+from game.zombie_batch import ZombieBatch
 from game.weapons import BaseWeapon, FiringModes, WeaponBuff, WeaponBuffTypes, WeaponStats, WEAPONS
 import utils.tween_module as TweenModule
 import utils.interpolation as interpolation
 from utils.my_timer import Timer
+from utils.profiler import profiler
+from time import perf_counter_ns
 
 class ZombieTypes:
     normal = 'normal'
@@ -40,16 +45,19 @@ class ZombieCluster:
         return new_cluster
 
 class BaseZombie(Sprite):
-    inactive_elements : list["BaseZombie"] = []
-    active_elements : list['BaseZombie'] = []
+    inactive_elements : PoolList["BaseZombie"] = PoolList()
+    active_elements : PoolList['BaseZombie'] = PoolList()
 
     test_image : pygame.Surface = pygame.surface.Surface((50, 50))
     test_image.set_colorkey([0, 0, 255])
     test_image.fill([0, 0, 255])
     pygame.draw.circle(test_image, "Red", (25, 25), 25)
     ui_clusters : list[TextSprite] = []
+    spare_clusters : list[TextSprite] = []
     str_type = None
     flash_image = load_alpha_to_colorkey('assets/graphics/enemy/flash_dark.png', [0, 255, 0])
+    USE_BATCH_MOVEMENT : bool = False
+    movement_batch : ZombieBatch = ZombieBatch()
     def __init__(self) -> None:
         super().__init__()
         self.dynamic_mask = True
@@ -114,49 +122,19 @@ class BaseZombie(Sprite):
         self.update_flash()
         if not self.flashing: self.kill_instance_safe()
     
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        if element in BaseZombie.active_elements:
-            BaseZombie.active_elements.remove(element)
-        
-        if element in Sprite.active_elements:
-            Sprite.active_elements.remove(element)
-        
-        if element not in BaseZombie.inactive_elements:
-            BaseZombie.inactive_elements.append(element)
-
-        if element not in Sprite.inactive_elements:
-            Sprite.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        if element not in BaseZombie.active_elements:
-            BaseZombie.active_elements.append(element)
-        
-        if element not in Sprite.active_elements:
-            Sprite.active_elements.append(element)
-
-
-        if element in BaseZombie.inactive_elements:
-            BaseZombie.inactive_elements.remove(element)
-
-        if element in Sprite.inactive_elements:
-            Sprite.inactive_elements.remove(element)   
-    
     def update(self, delta: float):
         if not core_object.game.is_nm_state(): return
         if self.is_dying:
             self.update_death_state()
             return
-        player_direction : pygame.Vector2 = (core_object.game.player.position - self.position).normalize()
-        self.position += player_direction * self.speed * delta
+        if not BaseZombie.USE_BATCH_MOVEMENT:
+            player_direction : pygame.Vector2 = (core_object.game.player.position - self.position).normalize()
+            self.position += player_direction * self.speed * delta
         self.do_collisions()
         self.update_flash()
     
     def do_collisions(self):
-        bullets : list[BaseProjectile] = self.get_all_colliding([BaseProjectile.active_elements])
+        bullets : list[BaseProjectile] = self.get_all_colliding(BaseProjectile)
         for bullet in bullets:
             if not isinstance(bullet, BaseProjectile):continue
             if not bullet.is_hostile(bullet.TEAMS.enemy):continue          
@@ -172,55 +150,61 @@ class BaseZombie(Sprite):
     
     @classmethod
     def update_class(cls, delta: float):
-        clusters : dict[tuple[float, float], ZombieCluster] = {}
-        grouped_clusters : dict[tuple[float, float], int] = {}
-        for i, zombie in enumerate(BaseZombie.active_elements):
-            zombie_pos = zombie.position
-            result = ZombieCluster()
-            result.zombies.add(zombie)
-            for j, other_zombie in enumerate(BaseZombie.active_elements):
-                if i >= j: continue
-                if other_zombie == zombie: continue
-                other_zombie_pos = other_zombie.position
-                distance_squared = (zombie_pos - other_zombie_pos).magnitude_squared()
-                if distance_squared <= 18 * 18:
-                    result.zombies.add(other_zombie)
-            if result.get_count() >= 3: clusters[(zombie_pos.x, zombie_pos.y)] = result
-        
-        banned_clusters : list[tuple[float, float]] = []
-        for i, cluster in enumerate(clusters):
-            if cluster in banned_clusters: continue
-            group : list[tuple[float, float]] = [cluster]
-            for j, other_cluster in enumerate(clusters):
-                if i >= j: continue
-                if cluster == other_cluster: continue
-                if other_cluster in banned_clusters: continue
-                distance_squared = (cluster[0] - other_cluster[0]) ** 2 + (cluster[1] - other_cluster[1]) ** 2
-                if distance_squared < 18 * 18:
-                    group.append(other_cluster)
-                    banned_clusters.append(other_cluster)
-
-            banned_clusters.append(cluster)
-            grouped_clusters[tuple_vec_average(group)] = ZombieCluster.combine([clusters[pos] for pos in group]).get_count()
-        cls.clear_clusters()
-        for cluster in grouped_clusters:
+        if BaseZombie.USE_BATCH_MOVEMENT: cls.move_chasing_zombies(delta)
+        if profiler.enabled: start = perf_counter_ns()
+        positions : list[tuple[float, float]] = [(zombie.position.x, zombie.position.y) for zombie in BaseZombie.active_elements]
+        grouped_clusters : dict[tuple[float, float], int] = find_clusters(positions, 18, 3)
+        labels : list[TextSprite] = cls.ui_clusters
+        for index, cluster in enumerate(grouped_clusters):
             count : int = grouped_clusters[cluster]
-            cls.create_cluster(cluster, count)
-            
+            if index < len(labels):
+                cls.move_cluster(labels[index], cluster, count)
+            else:
+                cls.create_cluster(cluster, count)
+        while len(labels) > len(grouped_clusters):
+            cls.hide_cluster(labels.pop())
+        if profiler.enabled: profiler.add('clustering', start)
 
+    @classmethod
+    def move_chasing_zombies(cls, delta : float):
+        '''Batched version of the movement in BaseZombie.update, used when USE_BATCH_MOVEMENT is True.
+        Runs after every sprite has been updated, so the zombies collide at their new position on the next frame.'''
+        if not core_object.game.is_nm_state(): return
+        if profiler.enabled: start = perf_counter_ns()
+        chasing = [zombie for zombie in BaseZombie.active_elements 
+                   if not zombie.is_dying and not zombie._zombie and type(zombie).update is BaseZombie.update]
+        cls.movement_batch.move(chasing, core_object.game.player.position, delta)
+        if profiler.enabled: profiler.add('zombie_movement', start)
 
     @classmethod
     def clear_clusters(cls):
         for cluster in cls.ui_clusters:
             core_object.main_ui.remove(cluster)
+        cls.spare_clusters.extend(cls.ui_clusters)
         cls.ui_clusters.clear()
     
     @classmethod
     def create_cluster(cls, pos : tuple[float, float], count : int):
-        new_sprite = TextSprite(pos, 'midbottom', 0, f'X{count}', None, None, None, 0, (core_object.game.font_50, 'White', False), 
-                                ('Black', 2), colorkey=[0, 255, 0])
+        if cls.spare_clusters:
+            new_sprite = cls.spare_clusters.pop()
+            cls.move_cluster(new_sprite, pos, count)
+        else:
+            new_sprite = TextSprite(pos, 'midbottom', 0, f'X{count}', None, None, None, 0, (core_object.game.font_50, 'White', False), 
+                                    ('Black', 2), colorkey=[0, 255, 0])
         core_object.main_ui.add(new_sprite)
         cls.ui_clusters.append(new_sprite)
+    
+    @staticmethod
+    def move_cluster(label : TextSprite, pos : tuple[float, float], count : int):
+        '''Reuses an existing label. The text is only re-rendered when the count changes.'''
+        label.text = f'X{count}'
+        label.rect.midbottom = pos
+        label.position = pygame.Vector2(label.rect.center)
+    
+    @classmethod
+    def hide_cluster(cls, label : TextSprite):
+        core_object.main_ui.remove(label)
+        cls.spare_clusters.append(label)
                 
     
     def take_damage(self, damage : int) -> bool:
@@ -256,8 +240,8 @@ Sprite.register_class(BaseZombie)
 
 class NormalZombie(BaseZombie):
     test_image : pygame.Surface = load_alpha_to_colorkey('assets/graphics/enemy/normal/main.png', [73, 197, 2])
-    inactive_elements : list['NormalZombie'] = []
-    active_elements : list['NormalZombie'] = []
+    inactive_elements : PoolList['NormalZombie'] = PoolList()
+    active_elements : PoolList['NormalZombie'] = PoolList()
     str_type = ZombieTypes.normal
     def __init__(self) -> None:
         super().__init__()
@@ -292,30 +276,9 @@ class NormalZombie(BaseZombie):
         return element
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in NormalZombie.active_elements:
-            NormalZombie.active_elements.remove(element)
-        
-        if element not in NormalZombie.inactive_elements:
-            NormalZombie.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in NormalZombie.active_elements:
-            NormalZombie.active_elements.append(element)
-
-
-        if element in NormalZombie.inactive_elements:
-            NormalZombie.inactive_elements.remove(element)
-
 class QuickZombie(BaseZombie):
-    inactive_elements : list['NormalZombie'] = []
-    active_elements : list['NormalZombie'] = []
+    inactive_elements : PoolList['QuickZombie'] = PoolList()
+    active_elements : PoolList['QuickZombie'] = PoolList()
 
     test_image : pygame.Surface = load_alpha_to_colorkey('assets/graphics/enemy/quick/main.png', [73, 197, 2])
     str_type = ZombieTypes.quick
@@ -353,30 +316,9 @@ class QuickZombie(BaseZombie):
         return element
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in QuickZombie.active_elements:
-            QuickZombie.active_elements.remove(element)
-        
-        if element not in QuickZombie.inactive_elements:
-            QuickZombie.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in QuickZombie.active_elements:
-            QuickZombie.active_elements.append(element)
-
-
-        if element in QuickZombie.inactive_elements:
-            QuickZombie.inactive_elements.remove(element)
-
 class TankZombie(BaseZombie):
-    inactive_elements : list['NormalZombie'] = []
-    active_elements : list['NormalZombie'] = []
+    inactive_elements : PoolList['TankZombie'] = PoolList()
+    active_elements : PoolList['TankZombie'] = PoolList()
 
     test_image : pygame.Surface = load_alpha_to_colorkey('assets/graphics/enemy/tank/main.png', [73, 197, 2])
     str_type = ZombieTypes.tank
@@ -414,31 +356,10 @@ class TankZombie(BaseZombie):
         return element
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in TankZombie.active_elements:
-            TankZombie.active_elements.remove(element)
-        
-        if element not in TankZombie.inactive_elements:
-            TankZombie.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in TankZombie.active_elements:
-            TankZombie.active_elements.append(element)
-
-
-        if element in TankZombie.inactive_elements:
-            TankZombie.inactive_elements.remove(element)
-
 class RangedZombie(BaseZombie):
     test_image : pygame.Surface = load_alpha_to_colorkey('assets/graphics/enemy/ranged/main.png', [0, 255, 0])
-    inactive_elements : list['RangedZombie'] = []
-    active_elements : list['RangedZombie'] = []
+    inactive_elements : PoolList['RangedZombie'] = PoolList()
+    active_elements : PoolList['RangedZombie'] = PoolList()
     str_type = ZombieTypes.ranged
     def __init__(self) -> None:
         super().__init__()
@@ -500,31 +421,10 @@ class RangedZombie(BaseZombie):
                 self.entry_tween = None
             return
         bullet = self.weapon.shoot(self.position, (core_object.game.player.position - self.position).normalize())
-        if bullet: bullet.image = make_circle(4, (162, 42, 232))
+        if bullet: bullet.image = make_circle(4, (162, 42, 232), shared=True)
         self.update_flash()
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in RangedZombie.active_elements:
-            RangedZombie.active_elements.remove(element)
-        
-        if element not in RangedZombie.inactive_elements:
-            RangedZombie.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in RangedZombie.active_elements:
-            RangedZombie.active_elements.append(element)
-
-
-        if element in RangedZombie.inactive_elements:
-            RangedZombie.inactive_elements.remove(element)
-    
     def clean_instance(self):
         super().clean_instance()
         self.entry_tween = None
@@ -1,5 +1,6 @@
 import pygame
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 from core.core import core_object
 
 from utils.animation import Animation
@@ -7,8 +8,11 @@ from utils.pivot_2d import Pivot2D
 
 from game.projectiles import BaseProjectile
 from game.enemy import BaseZombie
-from utils.helpers import make_upgrade_bar, reset_upgrade_bar, load_alpha_to_colorkey, make_circle, closest_point, make_right_arrow
+from utils.helpers import load_alpha_to_colorkey, make_circle, closest_point, make_right_arrow
 from utils.ui.ui_sprite import UiSprite
+from utils.ui.bar_sprite import BarSprite
+from utils.rotation_cache import rotation_cache
+from utils.angular_index import AngularIndex
 from utils.my_timer import Timer
 from dataclasses import dataclass
 from game.weapons import FiringModes, WeaponStats, WeaponBuff, WeaponBuffTypes, WEAPONS
@@ -27,8 +31,8 @@ class PlayerJoystick:
         self.is_grabbed : bool = False
 
         self.amplitude : float = amplitude
-        circle1 = make_circle(self.amplitude * 0.5, (150, 150, 150)).convert_alpha()
-        circle2 = make_circle(self.amplitude, (90, 90, 90))
+        circle1 = make_circle(self.amplitude * 0.5, (150, 150, 150), shared=True).convert_alpha()
+        circle2 = make_circle(self.amplitude, (90, 90, 90), shared=True)
         circle2 = circle2.convert_alpha()
         circle2.set_alpha(180)
         circle1.set_alpha(225)
@@ -41,14 +45,14 @@ class PlayerJoystick:
         if not self.is_grabbed: 
             self.pos = self.start_pos.copy()
         else:
-            self.pos = pygame.Vector2(core_object.active_fingers[self.grab_id]) + self.grab_offset
+            self.pos = pygame.Vector2(core_object.input_state.fingers[self.grab_id]) + self.grab_offset
         self.clamp_pos()
         self.update_visuals()
     
     def grab(self, finger_id : int, grab_pos : pygame.Vector2|None, force_grab : bool = False):
         if self.is_grabbed: return
         if (not self.can_grab(grab_pos)) or (not force_grab): return
-        if grab_pos is None: grab_pos = pygame.Vector2(core_object.active_fingers[finger_id])
+        if grab_pos is None: grab_pos = pygame.Vector2(core_object.input_state.fingers[finger_id])
         
         self.grab_id = finger_id
         self.is_grabbed = True
@@ -87,12 +91,12 @@ class PlayerJoystick:
         self.background : UiSprite = UiSprite(circle2, circle2.get_rect(center = self.start_pos), 0, 'joy_background', zindex=1)
 
     def update_visuals(self):
-        self.background.rect.center = round(self.start_pos)
-        self.visual_component.rect.center = round(self.pos)
+        core_object.main_ui.update_element(self.background, center=round(self.start_pos))
+        core_object.main_ui.update_element(self.visual_component, center=round(self.pos))
 
 class Player(Sprite):
-    active_elements : list['Player'] = []
-    inactive_elements : list['Player'] = []
+    active_elements : PoolList['Player'] = PoolList()
+    inactive_elements : PoolList['Player'] = PoolList()
     offset = 0
     '''
     test_image : pygame.Surface = pygame.surface.Surface((50, 50))
@@ -104,6 +108,7 @@ class Player(Sprite):
     ui_heart_image : pygame.Surface = pygame.image.load("assets/graphics/ui/heart_green_colorkey.png")
     ui_heart_image.set_colorkey([0, 255, 0])
     ui_heart_image = pygame.transform.scale_by(ui_heart_image, 0.1)
+    aim_arrow_image : pygame.Surface = make_right_arrow(20, 20, shared=True)
 
     death_anim : Animation = Animation.get_animation("player_death")
     screen_transition : Animation = Animation.get_animation("player_screen_transition")
@@ -115,6 +120,7 @@ class Player(Sprite):
 
     fast_shot_sfx = pygame.mixer.Sound('assets/audio/fast_shot.ogg')
     fast_shot_sfx.set_volume(0.10)
+    aim_index : AngularIndex = AngularIndex()
 
     def __init__(self) -> None:
         super().__init__()
@@ -122,11 +128,11 @@ class Player(Sprite):
         self.hp : int
 
         self.main_heart : UiSprite|None = None
-        self.ui_healthbar : UiSprite|None = None
+        self.ui_healthbar : BarSprite|None = None
         self.ui_aim_arrow : UiSprite|None = None
         self.current_aim_arrow_orientation : pygame.Vector2|None = None
         self.last_arrow_press_timer : Timer|None = None
-        self.armor_healthbar : UiSprite|None = None
+        self.armor_healthbar : BarSprite|None = None
         self.weapon : BaseWeapon
         self.armor : BaseArmor|None
 
@@ -139,7 +145,8 @@ class Player(Sprite):
         self.movement_joystick : PlayerJoystick|None
         self.aim_joystick : PlayerJoystick|None
         self.finger_id_stack : list[int]|None
-        self.arrow_map : dict[int, Timer|bool]|None
+        self.arrow_map : dict[int, bool]|None
+        self.arrow_release_times : dict[int, float]|None
 
         self.dynamic_mask = True
         Player.inactive_elements.append(self)
@@ -168,6 +175,7 @@ class Player(Sprite):
             element.aim_joystick = None
             element.finger_id_stack = None
         element.arrow_map = {pygame.K_UP : False, pygame.K_DOWN : False, pygame.K_LEFT : False, pygame.K_RIGHT : False}
+        element.arrow_release_times = {}
 
         element.position = new_pos
         element.align_rect()
@@ -177,7 +185,7 @@ class Player(Sprite):
         element.max_hp = 5 
         element.hp = element.max_hp
         
-        use_debug_weapon = 'debug' if (pygame.key.get_pressed()[pygame.K_o]) and core_object.IS_DEBUG else False
+        use_debug_weapon = 'debug' if core_object.input_state.is_pressed(pygame.K_o) and core_object.IS_DEBUG else False
         element.weapon = WEAPONS[use_debug_weapon or core_object.storage.weapon_equipped]
         element.weapon.get_game_source()
 
@@ -199,14 +207,12 @@ class Player(Sprite):
             element.max_hp *= (1 + element.equipped_armor_perks.get('Vitality', 0) * 0.2)
             element.hp = element.max_hp
 
-        bar_image = make_upgrade_bar(150, 25, 1)
-        element.ui_healthbar = UiSprite(bar_image, bar_image.get_rect(topright = (950, 20)), 0, 'healthbar')
+        element.ui_healthbar = BarSprite('topright', (950, 20), 150, 25, name='healthbar')
         core_object.main_ui.add(element.ui_healthbar)
         element.update_healthbar()
 
         if element.armor:
-            bar_image2 = make_upgrade_bar(150, 25, 1)
-            element.armor_healthbar = UiSprite(bar_image2, bar_image2.get_rect(topright = (950, element.ui_healthbar.rect.bottom + 10)), 0, 'a_healthbar')
+            element.armor_healthbar = BarSprite('topright', (950, element.ui_healthbar.rect.bottom + 10), 150, 25, name='a_healthbar')
             core_object.main_ui.add(element.armor_healthbar)
             element.update_armor_healthbar()
         element.main_heart = UiSprite(Player.ui_heart_image, Player.ui_heart_image.get_rect(topright = (793, 15)), 
@@ -236,19 +242,22 @@ class Player(Sprite):
         elif self.last_arrow_press_timer.isover():
             self.current_aim_arrow_orientation = pygame.Vector2(0,0)
 
-        if aim_arrow: core_object.main_ui.remove(aim_arrow)
-        if self.current_aim_arrow_orientation.magnitude() <= 0: return
+        if self.current_aim_arrow_orientation.magnitude() <= 0:
+            if aim_arrow: core_object.main_ui.update_element(aim_arrow, visible=False)
+            return
 
 
         arrow_dir = self.current_aim_arrow_orientation
-        surf : pygame.Surface = make_right_arrow(20, 20)
         offset : pygame.Vector2 = pygame.Vector2(50, 0)
         angle : float = arrow_dir.angle_to(pygame.Vector2(1, 0))
 
-        surf = pygame.transform.rotate(surf, angle)
+        surf : pygame.Surface = rotation_cache.rotate(Player.aim_arrow_image, angle)
         offset.rotate_ip(-angle)
         rect : pygame.Rect = surf.get_rect(center = round(self.position + offset))
 
+        if aim_arrow:
+            core_object.main_ui.update_element(aim_arrow, surf, rect, visible=True)
+            return
         new_aim_arrow : UiSprite = UiSprite(surf, rect, 0, 'aim_arrow', zindex=20)
         core_object.main_ui.add(new_aim_arrow)
         self.ui_aim_arrow = new_aim_arrow
@@ -258,59 +267,38 @@ class Player(Sprite):
         control_scheme : str = core_object.settings.info['ControlMethod']
         move_vector : pygame.Vector2 = pygame.Vector2(0,0)
         if control_scheme != 'Mobile':
-            keyboard_map = pygame.key.get_pressed()
-            if keyboard_map[pygame.K_a]:
-                move_vector += pygame.Vector2(-1, 0)
-            if keyboard_map[pygame.K_d]:
-                move_vector += pygame.Vector2(1, 0)
-            if keyboard_map[pygame.K_s]:
-                move_vector += pygame.Vector2(0, 1)
-            if keyboard_map[pygame.K_w]:
-                move_vector += pygame.Vector2(0, -1)
-            if move_vector.magnitude() != 0: move_vector.normalize_ip()
+            move_vector = core_object.input_state.move_vector.copy()
         else:
             move_vector = self.movement_joystick.get_vector()
         return move_vector
     
     def get_mouse_vector(self) -> pygame.Vector2:
-        return (pygame.Vector2(pygame.mouse.get_pos()) - self.position).normalize()
+        return (core_object.input_state.mouse_pos - self.position).normalize()
     
     def get_arrow_key_vector(self) -> pygame.Vector2:
-        keyboard_map = pygame.key.get_pressed()
-        move_vector : pygame.Vector2 = pygame.Vector2(0,0)
-        if keyboard_map[pygame.K_LEFT]:
-            move_vector += pygame.Vector2(-1, 0)
-        if keyboard_map[pygame.K_RIGHT]:
-            move_vector += pygame.Vector2(1, 0)
-        if keyboard_map[pygame.K_DOWN]:
-            move_vector += pygame.Vector2(0, 1)
-        if keyboard_map[pygame.K_UP]:
-            move_vector += pygame.Vector2(0, -1)
-        if move_vector.magnitude() != 0: move_vector.normalize_ip()
-        return move_vector
+        return core_object.input_state.arrow_vector.copy()
     
     def update_arrow_map(self):
         if not self.arrow_map: return
-        keyboard_map = pygame.key.get_pressed()
-        KEYS : tuple[int] = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_UP)
+        input_state = core_object.input_state
+        KEYS : tuple[int] = input_state.ARROW_KEYS
         any_press : bool = False
         for key in KEYS:
-            is_pressed : bool = keyboard_map[key]
-            val : bool|Timer = self.arrow_map[key]
-            if is_pressed:
+            if input_state.is_pressed(key):
                 self.arrow_map[key] = True
+                self.arrow_release_times.pop(key, None)
                 any_press = True
-            else:
-                if val is True:
-                    self.arrow_map[key] = Timer(0.06, core_object.game.game_timer.get_time)
-                elif val is False:
-                    pass
-                else:
-                    if val.isover():
-                        self.arrow_map[key] = False
+            elif key in self.arrow_release_times:
+                #Released keys stay held for a short moment, so letting go of a diagonal does not snap the aim to one axis
+                if core_object.game.game_timer.get_time() - self.arrow_release_times[key] > 0.06:
+                    self.arrow_map[key] = False
+                    self.arrow_release_times.pop(key)
+            elif self.arrow_map[key]:
+                self.arrow_release_times[key] = core_object.game.game_timer.get_time()
         if not any_press:
             for key in KEYS:
                 self.arrow_map[key] = False
+            self.arrow_release_times.clear()
         else:
             self.last_arrow_press_timer.set_duration(0.15)
     
@@ -332,20 +320,21 @@ class Player(Sprite):
         if not self.weapon.stats.fire_mode == FiringModes.auto: return
         control_scheme : str = core_object.settings.info['ControlMethod']
         if control_scheme == 'Mobile':
-            if self.finger_id_stack and core_object.active_fingers:
-                active_fingers : list[int] = list(core_object.active_fingers.keys())
+            fingers : dict[int, tuple[float, float]] = core_object.input_state.fingers
+            if self.finger_id_stack and fingers:
+                active_fingers : list[int] = list(fingers.keys())
                 if (len(active_fingers) >= 2) or (active_fingers[0] != self.movement_joystick.grab_id):
-                    self.shoot('Touch', pygame.Vector2(core_object.active_fingers[self.finger_id_stack[-1]]))
+                    self.shoot('Touch', pygame.Vector2(fingers[self.finger_id_stack[-1]]))
             elif self.aim_joystick.get_vector():
-                self.shoot('Touch', list(core_object.active_fingers.values())[-1])
+                self.shoot('Touch', list(fingers.values())[-1])
             return
         elif control_scheme != 'Expert':
             arrow_dir = self.get_arrow_map_direction()
             if arrow_dir.magnitude() > 0: self.last_shot_direction = arrow_dir
         
-        if (pygame.mouse.get_pressed()[0] and core_object.game.game_timer.get_time() > 0.3): 
+        if (core_object.input_state.mouse_buttons[0] and core_object.game.game_timer.get_time() > 0.3): 
             self.shoot('Mouse')
-        elif (pygame.key.get_pressed())[pygame.K_SPACE]:
+        elif core_object.input_state.is_pressed(pygame.K_SPACE):
             self.shoot('Space')
 
     def do_movement(self, delta : float):
@@ -390,7 +379,7 @@ class Player(Sprite):
     def shoot(self, input_method : str, press_pos : None|pygame.Vector2 = None):
         if not self.weapon.shot_cooldown.isover(): return
         control_scheme : str = core_object.settings.info['ControlMethod']
-        mouse_direction : pygame.Vector2 = (pygame.Vector2(pygame.mouse.get_pos()) - self.position).normalize()
+        mouse_direction : pygame.Vector2 = (core_object.input_state.mouse_pos - self.position).normalize()
         key_direction : pygame.Vector2 = self.last_shot_direction.copy()
         arrow_direction : pygame.Vector2 = self.get_arrow_map_direction()
         shot_direction : pygame.Vector2
@@ -438,26 +427,20 @@ class Player(Sprite):
         if result:
             core_object.bg_manager.play_sfx(self.shot_sfx if self.weapon.stats.firerate <= 7 else self.fast_shot_sfx, 1)
 
+    def get_aim_index(self) -> AngularIndex:
+        '''Index of the zombies around the player. Only rebuilt once per frame, or when the player moved or the zombie count changed.'''
+        key = (core_object.frame_counter, self.position.x, self.position.y, len(BaseZombie.active_elements))
+        if not Player.aim_index.is_valid(key):
+            Player.aim_index.build(self.position, BaseZombie.active_elements, lambda enemy : enemy.position, key)
+        return Player.aim_index
+
     def correct_aim(self, shot_direction : pygame.Vector2, max_aim_correction : float = 17.5) -> pygame.Vector2:
         if not BaseZombie.active_elements: return shot_direction
-        closest_angle : float = 9999
-        closest_enemy : BaseZombie|None = None
-        closest_enemy_direction : pygame.Vector2|None = None
-        V = pygame.Vector2
-        player_to_zomb_vec : pygame.Vector2
-        angle_diff : float
-        for enemy in BaseZombie.active_elements:
-            player_to_zomb_vec = (enemy.position - self.position).normalize()
-            angle_diff = abs((player_to_zomb_vec).angle_to(shot_direction))
-            if angle_diff > 180: angle_diff = 360 - angle_diff
-            if angle_diff < closest_angle:
-                closest_angle = angle_diff
-                closest_enemy = enemy
-                closest_enemy_direction = player_to_zomb_vec
-        
-        if not enemy: return shot_direction
-        if closest_angle <= 0.8 or closest_angle >= max_aim_correction: return shot_direction
-        return closest_enemy_direction
+        result = self.get_aim_index().nearest_in_cone(shot_direction, max_aim_correction)
+        if result is None: return shot_direction
+        _, closest_angle, closest_enemy_direction = result
+        if closest_angle <= 0.8: return shot_direction
+        return closest_enemy_direction.copy()
 
 
     def update_healthbar(self):
@@ -466,8 +449,7 @@ class Player(Sprite):
         for color, value in colors.items():
             if hp_percent > value:
                 break
-        reset_upgrade_bar(self.ui_healthbar.surf, 1, 150, 25)
-        pygame.draw.rect(self.ui_healthbar.surf, color, (3, 3, pygame.math.lerp(0, 150, hp_percent), 25))
+        self.ui_healthbar.set_fill(hp_percent, color)
     
     def update_healthbars(self):
         self.update_healthbar()
@@ -475,9 +457,8 @@ class Player(Sprite):
     
     def update_armor_healthbar(self): 
         if not self.armor: return
-        reset_upgrade_bar(self.armor_healthbar.surf, 1, 150, 25)
         armor_percent : float = self.armor.stats.health / self.armor.stats.max_health
-        pygame.draw.rect(self.armor_healthbar.surf, (26, 156, 217), (3, 3, pygame.math.lerp(0, 150, armor_percent), 25))
+        self.armor_healthbar.set_fill(armor_percent, (26, 156, 217))
 
     
     def handle_key_event(self, event : pygame.Event):
@@ -563,6 +544,7 @@ class Player(Sprite):
         self.aim_joystick = None
         self.finger_id_stack = None
         self.arrow_map = None
+        self.arrow_release_times = None
         
         self.hp = None
         self.max_hp = None
@@ -0,0 +1,61 @@
+import pygame
+from game.sprite import Sprite
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ProjectileBatch:
+    '''Moves every live projectile in one step, then culls the ones that left an area in bulk.
+    Positions and velocities are gathered into flat arrays (NumPy arrays when available and there are enough projectiles),
+    integrated together and written back in place to the position vector of each projectile.
+    The area test runs in one Rect.collidelistall call over the updated rects.'''
+    NUMPY_MIN_COUNT : int = 32
+    def __init__(self, use_numpy : bool = True) -> None:
+        self.use_numpy : bool = use_numpy and numpy is not None
+
+    def integrate(self, projectiles : list[Sprite], delta : float):
+        '''Adds velocity * delta to the position of every projectile, the same way BaseProjectile.update does.'''
+        if self.use_numpy and len(projectiles) >= ProjectileBatch.NUMPY_MIN_COUNT:
+            self.integrate_numpy(projectiles, delta)
+            return
+        use_grids : bool = bool(Sprite.spatial_grids)
+        for projectile in projectiles:
+            pivot = projectile.pivot
+            origin = pivot._origin
+            velocity = projectile.velocity
+            origin.update(origin.x + velocity.x * delta, origin.y + velocity.y * delta)
+            pivot.is_cached = False
+            self.align(projectile, origin, use_grids)
+
+    def integrate_numpy(self, projectiles : list[Sprite], delta : float):
+        positions = numpy.array([(projectile.pivot._origin.x, projectile.pivot._origin.y) for projectile in projectiles])
+        velocities = numpy.array([(projectile.velocity.x, projectile.velocity.y) for projectile in projectiles])
+        positions += velocities * delta
+        use_grids : bool = bool(Sprite.spatial_grids)
+        for projectile, (x, y) in zip(projectiles, positions.tolist()):
+            pivot = projectile.pivot
+            pivot._origin.update(x, y)
+            pivot.is_cached = False
+            self.align(projectile, pivot._origin, use_grids)
+
+    @staticmethod
+    def align(projectile : Sprite, origin : pygame.Vector2, use_grids : bool):
+        new_center = round(origin)
+        rect = projectile.rect
+        if rect.center == new_center: return
+        rect.center = new_center
+        if use_grids: Sprite.update_spatial_grids(projectile)
+
+    def get_outside(self, projectiles : list[Sprite], area : pygame.Rect) -> list[Sprite]:
+        '''Returns the projectiles whose rect does not touch area.'''
+        inside : list[int] = area.collidelistall([projectile.rect for projectile in projectiles])
+        if len(inside) == len(projectiles): return []
+        inside_set : set[int] = set(inside)
+        return [projectile for index, projectile in enumerate(projectiles) if index not in inside_set]
+
+    def update(self, projectiles : list[Sprite], delta : float, area : pygame.Rect) -> list[Sprite]:
+        '''Integrates projectiles and returns the ones that left area.'''
+        if not projectiles: return []
+        self.integrate(projectiles, delta)
+        return self.get_outside(projectiles, area)
@@ -1,8 +1,13 @@
 import pygame
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 from core.core import core_object
 
 from utils.pivot_2d import Pivot2D
+from utils.mask_cache import mask_cache
+from game.projectile_batch import ProjectileBatch
+from utils.profiler import profiler
+from time import perf_counter_ns
 import random
 
 class BulletTeams:
@@ -12,8 +17,8 @@ class BulletTeams:
         self.enemy = 'Enemy'
 
 class BaseProjectile(Sprite):
-    inactive_elements : list['BaseProjectile'] = []
-    active_elements : list['BaseProjectile'] = []
+    inactive_elements : PoolList['BaseProjectile'] = PoolList()
+    active_elements : PoolList['BaseProjectile'] = PoolList()
 
     test_image : pygame.Surface = pygame.surface.Surface((8, 8))
     test_image.set_colorkey([0, 255, 0])
@@ -27,6 +32,8 @@ class BaseProjectile(Sprite):
 
     game_area : pygame.Rect = pygame.Rect(0, 0, *core_object.main_display.get_size())
     TEAMS : BulletTeams = BulletTeams()
+    USE_BATCH_INTEGRATION : bool = False
+    batch : ProjectileBatch = ProjectileBatch()
 
     def __init__(self) -> None:
         super().__init__()
@@ -35,38 +42,6 @@ class BaseProjectile(Sprite):
         self.damage : float|int
         BaseProjectile.inactive_elements.append(self)
     
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        if element in BaseProjectile.active_elements:
-            BaseProjectile.active_elements.remove(element)
-        
-        if element in Sprite.active_elements:
-            Sprite.active_elements.remove(element)
-        
-        if element not in BaseProjectile.inactive_elements:
-            BaseProjectile.inactive_elements.append(element)
-
-        if element not in Sprite.inactive_elements:
-            Sprite.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        if element not in BaseProjectile.active_elements:
-            BaseProjectile.active_elements.append(element)
-        
-        if element not in Sprite.active_elements:
-            Sprite.active_elements.append(element)
-
-
-        if element in BaseProjectile.inactive_elements:
-            BaseProjectile.inactive_elements.remove(element)
-
-        if element in Sprite.inactive_elements:
-            Sprite.inactive_elements.remove(element)
-
-    
     @classmethod
     def spawn(cls, pos : pygame.Vector2, speed : float, direction : pygame.Vector2, team : str = 'Friendly',
               damage : float|int = 1):
@@ -74,7 +49,7 @@ class BaseProjectile(Sprite):
         cls.unpool(element)
 
         element.image = cls.test_image
-        element.mask = pygame.mask.from_surface(element.image)
+        element.mask = mask_cache.get(element.image)
         element.rect = element.image.get_rect()
 
         element.position = pos.copy()
@@ -101,10 +76,23 @@ class BaseProjectile(Sprite):
     
     def update(self, delta: float):
         if not core_object.game.is_nm_state(): return
+        if BaseProjectile.USE_BATCH_INTEGRATION: return
         self.position += self.velocity * delta
         if not self.rect.colliderect(BaseProjectile.game_area):
             self.kill_instance_safe()
     
+    @classmethod
+    def update_class(cls, delta : float):
+        '''When USE_BATCH_INTEGRATION is True, moves every projectile at once and pools the ones that left the game area.
+        Runs after every sprite has been updated, so projectiles collide at their new position on the next frame.'''
+        if not BaseProjectile.USE_BATCH_INTEGRATION: return
+        if not core_object.game.is_nm_state(): return
+        if profiler.enabled: start = perf_counter_ns()
+        projectiles : list[BaseProjectile] = [projectile for projectile in BaseProjectile.active_elements if not projectile._zombie]
+        for projectile in cls.batch.update(projectiles, delta, BaseProjectile.game_area):
+            projectile.kill_instance()
+        if profiler.enabled: profiler.add('projectile_movement', start)
+    
     def when_hit(self):
         self.kill_instance_safe()
     
@@ -124,8 +112,8 @@ class BaseProjectile(Sprite):
 
 
 class NormalProjectile(BaseProjectile):
-    inactive_elements : list['NormalProjectile'] = []
-    active_elements : list['NormalProjectile'] = []
+    inactive_elements : PoolList['NormalProjectile'] = PoolList()
+    active_elements : PoolList['NormalProjectile'] = PoolList()
     def __init__(self) -> None:
         super().__init__()
         NormalProjectile.inactive_elements.append(self)
@@ -137,7 +125,7 @@ class NormalProjectile(BaseProjectile):
         cls.unpool(element)
 
         element.image = image or cls.test_image
-        element.mask = pygame.mask.from_surface(element.image)
+        element.mask = mask_cache.get(element.image)
         element.rect = element.image.get_rect()
 
         element.position = pos.copy()
@@ -153,30 +141,9 @@ class NormalProjectile(BaseProjectile):
         return element
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in NormalProjectile.active_elements:
-            NormalProjectile.active_elements.remove(element)
-        
-        if element not in NormalProjectile.inactive_elements:
-            NormalProjectile.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in NormalProjectile.active_elements:
-            NormalProjectile.active_elements.append(element)
-
-
-        if element in NormalProjectile.inactive_elements:
-            NormalProjectile.inactive_elements.remove(element)
-    
 class PeirceProjectile(BaseProjectile):
-    inactive_elements : list['PeirceProjectile'] = []
-    active_elements : list['PeirceProjectile'] = []
+    inactive_elements : PoolList['PeirceProjectile'] = PoolList()
+    active_elements : PoolList['PeirceProjectile'] = PoolList()
     def __init__(self) -> None:
         super().__init__()
         self.health : int
@@ -189,7 +156,7 @@ class PeirceProjectile(BaseProjectile):
         cls.unpool(element)
 
         element.image = cls.test_image2
-        element.mask = pygame.mask.from_surface(element.image)
+        element.mask = mask_cache.get(element.image)
         element.rect = element.image.get_rect()
 
         element.position = pos.copy()
@@ -207,27 +174,6 @@ class PeirceProjectile(BaseProjectile):
         return element
         
 
-    @classmethod
-    def pool(cls, element):
-        '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        super().pool(element)
-        if element in PeirceProjectile.active_elements:
-            PeirceProjectile.active_elements.remove(element)
-        
-        if element not in PeirceProjectile.inactive_elements:
-            PeirceProjectile.inactive_elements.append(element)
-    
-    @classmethod
-    def unpool(cls, element):
-        '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-        super().unpool(element)
-        if element not in PeirceProjectile.active_elements:
-            PeirceProjectile.active_elements.append(element)
-
-
-        if element in PeirceProjectile.inactive_elements:
-            PeirceProjectile.inactive_elements.remove(element)
-    
     def clean_instance(self):
         self.health = None
         self.hit_memory = None
@@ -237,6 +183,8 @@ class PeirceProjectile(BaseProjectile):
         self.health -= 1
         if self.health <= 0: self.kill_instance_safe()
         
+Sprite.register_class(BaseProjectile)
+
 for _ in range(99):
     NormalProjectile()
     PeirceProjectile()
\ No newline at end of file
@@ -5,14 +5,25 @@ from utils.helpers import is_sorted
 from utils.pivot_2d import Pivot2D
 from inspect import isclass
 from utils.raycaster import RayCastMask
+from utils.spatial_grid import SpatialGrid
+from utils.pool_list import PoolList
+from utils.render_queue import get_zindex
+from utils.profiler import profiler
+from utils.mask_cache import mask_cache
+from time import perf_counter_ns
 
 class Sprite:
     '''Base class for all game objects.'''
-    active_elements : list['Sprite'] = []
-    inactive_elements : list['Sprite']  = []
+    active_elements : PoolList['Sprite'] = PoolList()
+    inactive_elements : PoolList['Sprite'] = PoolList()
     ordered_sprites : list['Sprite'] = []
     registered_classes : list['Sprite'] = []
     SPRITE_CLICKED : int = pygame.event.custom_type()
+    USE_SPATIAL_GRID : bool = True
+    GRID_CELL_SIZE : int = 64
+    spatial_grids : dict[type['Sprite'], SpatialGrid] = {}
+    pool_levels : dict[type['Sprite'], tuple[type['Sprite'], ...]] = {}
+    render_order_dirty : bool = True
 
     def __init__(self) -> None:
         self._position : pygame.Vector2
@@ -21,11 +32,21 @@ class Sprite:
         self.rect : pygame.Rect
         self.mask : pygame.Mask
         self.dynamic_mask : bool = False
-        self.zindex : int
+        self._zindex : int|None = None
         self.animation_tracks : dict[str, AnimationTrack]
         Sprite.inactive_elements.append(self)
         self._zombie : bool = False
     
+    @property
+    def zindex(self) -> int|None:
+        return self._zindex
+    
+    @zindex.setter
+    def zindex(self, new_val : int|None):
+        if new_val == self._zindex: return
+        self._zindex = new_val
+        Sprite.render_order_dirty = True
+
     @property
     def image(self) -> pygame.Surface:
         return self._image
@@ -37,10 +58,11 @@ class Sprite:
             if new_surf is None:
                 self.mask = None
             else:
-                self.mask = pygame.mask.from_surface(new_surf)
+                self.mask = mask_cache.get(new_surf)
     
     def align_rect(self):
         self.rect.center = round(self.true_position)
+        if Sprite.spatial_grids: Sprite.update_spatial_grids(self)
     
     def move_rect(self, anchor : str, position : pygame.Vector2|int):
         self.rect.__setattr__(anchor, position)
@@ -109,38 +131,52 @@ class Sprite:
     def active(self):
         return (self in self.__class__.active_elements) or (self in Sprite.active_elements)
 
+    @staticmethod
+    def get_spatial_grid(sprite_class : type['Sprite']) -> SpatialGrid:
+        '''Returns the broadphase grid of sprite_class, (re)building it from its active elements if needed.'''
+        grid = Sprite.spatial_grids.get(sprite_class, None)
+        if grid is None:
+            grid = SpatialGrid(Sprite.GRID_CELL_SIZE)
+            Sprite.spatial_grids[sprite_class] = grid
+        if grid.stale:
+            grid.rebuild(sprite_class.active_elements)
+        return grid
+
+    @staticmethod
+    def update_spatial_grids(element : 'Sprite'):
+        for sprite_class, grid in Sprite.spatial_grids.items():
+            if grid.stale: continue
+            if isinstance(element, sprite_class): grid.update(element, element.rect)
+
+    @staticmethod
+    def remove_from_spatial_grids(element : 'Sprite'):
+        for grid in Sprite.spatial_grids.values():
+            grid.remove(element)
+
+    @staticmethod
+    def get_pool_levels(sprite_class : type['Sprite']) -> tuple[type['Sprite'], ...]:
+        '''Returns every class in the MRO of sprite_class that owns element pools, most derived first.'''
+        levels = Sprite.pool_levels.get(sprite_class, None)
+        if levels is None:
+            levels = tuple(level for level in sprite_class.__mro__ if 'active_elements' in level.__dict__)
+            Sprite.pool_levels[sprite_class] = levels
+        return levels
+
     @classmethod
     def pool(cls, element):
         '''Transfers an element from active to inactive state. Nothing changes if the element is already inactive.'''
-        if element in cls.active_elements:
-            cls.active_elements.remove(element)
-        
-        if element in Sprite.active_elements:
-            Sprite.active_elements.remove(element)
-        
-        if element not in cls.inactive_elements:
-            cls.inactive_elements.append(element)
-
-        if element not in Sprite.inactive_elements:
-            Sprite.inactive_elements.append(element)
+        if Sprite.spatial_grids: Sprite.remove_from_spatial_grids(element)
+        for level in Sprite.get_pool_levels(element.__class__):
+            level.active_elements.discard(element)
+            level.inactive_elements.append(element)
     
     @classmethod
     def unpool(cls, element):
         '''Transfers an element from inactive to active state. Nothing changes if the element is already active.'''
-
-        if element not in cls.active_elements:
-            cls.active_elements.append(element)
-        
-        if element not in Sprite.active_elements:
-            Sprite.active_elements.append(element)
-
-
-        if element in cls.inactive_elements:
-            cls.inactive_elements.remove(element)
-
-        if element in Sprite.inactive_elements:
-            Sprite.inactive_elements.remove(element)
-
+        for level in Sprite.get_pool_levels(element.__class__):
+            level.active_elements.append(element)
+            level.inactive_elements.discard(element)
+        Sprite.render_order_dirty = True
 
     
     @classmethod
@@ -292,17 +328,30 @@ class Sprite:
         if not self.rect.colliderect(ray.rect): return False
         return ray.collide_rect(self.rect)
 
+    def get_collision_candidates(self, collision_group : type['Sprite']|list['Sprite']) -> list['Sprite']:
+        '''Returns the elements of collision_group that may touch this sprite.
+        Sprite classes go through their spatial grid unless USE_SPATIAL_GRID is False. Plain lists are returned as-is.'''
+        if not isclass(collision_group): return collision_group
+        if not Sprite.USE_SPATIAL_GRID: return collision_group.active_elements
+        return Sprite.get_spatial_grid(collision_group).query(self.rect)
+
     def get_colliding(self, collision_groups : list[list['Sprite']]) -> Union['Sprite', None]:
         '''Returns the first sprite colliding this sprite within collision_group or None if there arent any. Uses mask collision.'''
+        if profiler.enabled: start = perf_counter_ns()
         try:
             collision_groups[0]
         except TypeError:
             collision_groups = [collision_groups]
+        return_val = None
         for collision_group in collision_groups:
-            actual_group = collision_group.active_elements if isclass(collision_group) else collision_group
+            actual_group = self.get_collision_candidates(collision_group)
             for element in actual_group:
-                if self.is_colliding(element) and not element._zombie: return element     
-        return None
+                if self.is_colliding(element) and not element._zombie: 
+                    return_val = element
+                    break
+            if return_val is not None: break
+        if profiler.enabled: profiler.add('collisions', start)
+        return return_val
     
     def get_rect_colliding(self, collision_groups : list[list['Sprite']]) -> Union['Sprite', None]:
         '''Returns the first sprite colliding this sprite within collision_group or None if there arent any. Uses a bounding box check.'''
@@ -311,23 +360,25 @@ class Sprite:
         except TypeError:
             collision_groups = [collision_groups]
         for collision_group in collision_groups:
-            actual_group = collision_group.active_elements if isclass(collision_group) else collision_group
+            actual_group = self.get_collision_candidates(collision_group)
             for element in actual_group:
                 if self.is_collding_rect(element) and not element._zombie: return element
         return None
     
     def get_all_colliding(self, collision_groups : list[list['Sprite']]) -> list['Sprite']:
         '''Returns all entities colliding this sprite within collision_group. Uses mask collision.'''
+        if profiler.enabled: start = perf_counter_ns()
         try:
             collision_groups[0]
         except TypeError:
             collision_groups = [collision_groups]
         return_val = []
         for collision_group in collision_groups:
-            actual_group = collision_group.active_elements if isclass(collision_group) else collision_group
+            actual_group = self.get_collision_candidates(collision_group)
             for element in actual_group:
                 if self.is_colliding(element) and not element._zombie:
                     return_val.append(element)
+        if profiler.enabled: profiler.add('collisions', start)
         return return_val
 
     def get_all_rect_colliding(self, collision_groups : list[list['Sprite']]) -> list['Sprite']:
@@ -338,7 +389,7 @@ class Sprite:
             collision_groups = [collision_groups]
         return_val = []
         for collision_group in collision_groups:
-            actual_group = collision_group.active_elements if isclass(collision_group) else collision_group
+            actual_group = self.get_collision_candidates(collision_group)
             for element in actual_group:
                 if self.is_collding_rect(element) and not element._zombie: return_val.append(element)
         return return_val
@@ -349,12 +400,18 @@ class Sprite:
     def is_active(self):
         return self in self.__class__.active_elements
     
+    @staticmethod
+    def get_render_order() -> PoolList['Sprite']:
+        '''Returns the active sprites sorted by zindex. Only sorts when a sprite was activated or a zindex changed.'''
+        if Sprite.render_order_dirty:
+            Sprite.active_elements.sort(key=get_zindex)
+            Sprite.render_order_dirty = False
+        return Sprite.active_elements
+
     @classmethod
     def draw_all_sprites(cls, display):
-        #if not is_sorted(cls.active_elements, key=lambda sprite : sprite.zindex):
-        cls.active_elements.sort(key=lambda sprite : sprite.zindex)
         element : Sprite
-        for element in cls.active_elements:
+        for element in Sprite.get_render_order():
             element.draw(display)
 
     
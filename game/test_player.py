@@ -1,5 +1,6 @@
 import pygame
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 from core.core import core_object
 
 from utils.animation import Animation
@@ -9,8 +10,8 @@ from utils.pivot_2d import Pivot2D
 class TestPlayer(Sprite):
     IMAGE_SIZE : tuple[int, int]|list[int] = (20, 60)
     test_anim : Animation = Animation.get_animation("test")
-    active_elements : list['TestPlayer'] = []
-    inactive_elements : list['TestPlayer'] = []
+    active_elements : PoolList['TestPlayer'] = PoolList()
+    inactive_elements : PoolList['TestPlayer'] = PoolList()
     #load assets
     test_image : pygame.Surface = pygame.surface.Surface(IMAGE_SIZE)
     pygame.draw.rect(test_image, "Red", (0,0, *IMAGE_SIZE))
@@ -51,20 +52,20 @@ class TestPlayer(Sprite):
         return element
     
     def update(self, delta: float):
-        keyboard_map = pygame.key.get_pressed()
+        input_state = core_object.input_state
         move_vector : pygame.Vector2 = pygame.Vector2(0,0)
         speed : int = 5
-        if keyboard_map[pygame.K_a]:
+        if input_state.is_pressed(pygame.K_a):
             move_vector += pygame.Vector2(-1, 0)
-        if keyboard_map[pygame.K_d]:
+        if input_state.is_pressed(pygame.K_d):
             move_vector += pygame.Vector2(1, 0)
-        if keyboard_map[pygame.K_s]:
+        if input_state.is_pressed(pygame.K_s):
             move_vector += pygame.Vector2(0, 1)
-        if keyboard_map[pygame.K_w]:
+        if input_state.is_pressed(pygame.K_w):
             move_vector += pygame.Vector2(0, -1)
-        if keyboard_map[pygame.K_e]:
+        if input_state.is_pressed(pygame.K_e):
             self.angle += 5 * delta
-        if keyboard_map[pygame.K_q]:
+        if input_state.is_pressed(pygame.K_q):
             self.angle -= 5 * delta
         if move_vector.magnitude(): move_vector.normalize()
         self.position += move_vector * speed * delta
@@ -0,0 +1,87 @@
+import pygame
+from math import sqrt
+from typing import Iterable
+from game.sprite import Sprite
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ZombieBatch:
+    '''Structure of arrays for zombie movement. Moves every chasing zombie towards a target in one step.
+    Positions and speeds are gathered into flat arrays, moved together (with NumPy when it is available and there are enough zombies,
+    with plain lists otherwise), then written back in place to the position vector of each zombie.
+    Rects and spatial grids are only touched when the rounded position of a zombie changed.'''
+    NUMPY_MIN_COUNT : int = 24
+    def __init__(self, use_numpy : bool = True) -> None:
+        self.use_numpy : bool = use_numpy and numpy is not None
+        self.zombies : list[Sprite] = []
+        self.xs : list[float] = []
+        self.ys : list[float] = []
+        self.speeds : list[float] = []
+
+    def gather(self, zombies : list[Sprite]):
+        '''Copies the position and speed of zombies into the arrays.
+        The position vector is read directly, zombies moved this way never have a pivot offset or angle.'''
+        self.zombies = zombies
+        self.xs = [zombie.pivot._origin.x for zombie in zombies]
+        self.ys = [zombie.pivot._origin.y for zombie in zombies]
+        self.speeds = [zombie.speed for zombie in zombies]
+
+    def move(self, zombies : list[Sprite], target : pygame.Vector2, delta : float):
+        '''Moves every zombie by speed * delta towards target, the same way BaseZombie.update does.'''
+        if not zombies: return
+        if self.use_numpy and len(zombies) >= ZombieBatch.NUMPY_MIN_COUNT:
+            self.gather(zombies)
+            self.move_numpy(target, delta)
+            self.scatter()
+        else:
+            self.move_lists(zombies, target, delta)
+
+    def move_lists(self, zombies : list[Sprite], target : pygame.Vector2, delta : float):
+        '''Fallback without NumPy : a single pass that reads, moves and writes back every zombie.'''
+        target_x, target_y = target.x, target.y
+        use_grids : bool = bool(Sprite.spatial_grids)
+        for zombie in zombies:
+            pivot = zombie.pivot
+            origin = pivot._origin
+            x, y = origin.x, origin.y
+            dx, dy = target_x - x, target_y - y
+            length = sqrt(dx * dx + dy * dy)
+            if length == 0: continue
+            speed = zombie.speed
+            origin.update(x + dx / length * speed * delta, y + dy / length * speed * delta)
+            pivot.is_cached = False
+            self.align(zombie, origin, use_grids)
+
+    def move_numpy(self, target : pygame.Vector2, delta : float):
+        xs = numpy.array(self.xs)
+        ys = numpy.array(self.ys)
+        speeds = numpy.array(self.speeds)
+        dx = target.x - xs
+        dy = target.y - ys
+        length = numpy.sqrt(dx * dx + dy * dy)
+        moving = length > 0
+        length[~moving] = 1
+        xs += numpy.where(moving, dx / length * speeds * delta, 0)
+        ys += numpy.where(moving, dy / length * speeds * delta, 0)
+        self.xs = xs.tolist()
+        self.ys = ys.tolist()
+
+    def scatter(self):
+        '''Writes the moved positions back to the zombies and realigns the rects that changed.'''
+        use_grids : bool = bool(Sprite.spatial_grids)
+        for zombie, x, y in zip(self.zombies, self.xs, self.ys):
+            pivot = zombie.pivot
+            origin = pivot._origin
+            origin.update(x, y)
+            pivot.is_cached = False
+            self.align(zombie, origin, use_grids)
+
+    @staticmethod
+    def align(zombie : Sprite, origin : pygame.Vector2, use_grids : bool):
+        new_center = round(origin)
+        rect = zombie.rect
+        if rect.center == new_center: return
+        rect.center = new_center
+        if use_grids: Sprite.update_spatial_grids(zombie)
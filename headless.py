@@ -0,0 +1,184 @@
+'''Runs game sessions without a window, as fast as possible.
+Time advances by a fixed step every frame and the random module is seeded, so the same arguments always play the same session.
+Example : python headless.py --seed 3 --weapon Shotgun --armor Light --god'''
+import os
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import pygame
+import argparse
+from time import perf_counter, perf_counter_ns
+
+pygame.init()
+window_size = (960, 540)
+window = pygame.display.set_mode(window_size)
+pygame.mixer.set_num_channels(48)
+
+from core.core import Core, core_object
+core = core_object
+core.init(window)
+core._hints()
+
+from game.sprite import Sprite
+Sprite._core_hint()
+
+from utils.animation import Animation, AnimationTrack, _sprite_hint
+_sprite_hint()
+
+core.menu.init()
+core.game.init()
+core.menu.add_connections()
+
+from game.enemy import BaseZombie
+from game.projectiles import BaseProjectile
+from game.game_module import BreakObjectives
+from utils.profiler import profiler
+
+class AutoPilot:
+    '''Scripted player input : aims at the closest zombie and fires whenever the weapon is ready.
+    Walks to the right edge when the next area has to be reached.'''
+    def __init__(self, god_mode : bool = False) -> None:
+        self.god_mode : bool = god_mode
+
+    def update(self):
+        game = core.game
+        player = game.player
+        if not game.is_nm_state() or player is None: return
+        if game.break_objective == BreakObjectives.right_edge and not BaseZombie.active_elements:
+            player.position.x = window_size[0]
+            return
+        target = self.get_closest_zombie(player.position)
+        if target is None: return
+        direction = target.position - player.position
+        if direction.magnitude() == 0: return
+        player.last_shot_direction = direction.normalize()
+        player.shoot('Space')
+
+    @staticmethod
+    def get_closest_zombie(position : pygame.Vector2) -> BaseZombie|None:
+        closest : BaseZombie|None = None
+        closest_distance : float = float('inf')
+        for zombie in BaseZombie.active_elements:
+            if zombie.is_dying: continue
+            distance = position.distance_squared_to(zombie.position)
+            if distance < closest_distance:
+                closest, closest_distance = zombie, distance
+        return closest
+
+    def heal(self):
+        '''Called after the sprites are updated, before the game checks if the player is alive.'''
+        player = core.game.player
+        if self.god_mode and player is not None: player.hp = player.max_hp
+
+class HeadlessSession:
+    '''Plays one game session with a fixed time step. Rendering is optional and off by default.'''
+    def __init__(self, seed : int|None = 0, fixed_dt : float = 1 / 60, control_method : str = 'Simple',
+                 weapon : str = 'Pistol', armor : str|None = None, god_mode : bool = False, render : bool = False) -> None:
+        self.seed : int|None = seed
+        self.fixed_dt : float = fixed_dt
+        self.render : bool = render
+        self.autopilot : AutoPilot = AutoPilot(god_mode)
+        self.frame : int = 0
+        self.result : dict|None = None
+        self.wave : int = 0
+        self.score : int = 0
+
+        core.setup_headless(seed, fixed_dt)
+        core.settings.load_default()
+        core.settings.info['ControlMethod'] = control_method
+        core.storage.weapon_equipped = weapon
+        core.storage.armor_equipped = armor
+        core.event_manager.bind(core.END_GAME, self.on_game_end)
+
+    def start(self):
+        core.menu.enter_stage1()
+        pygame.event.post(pygame.Event(core.START_GAME, {}))
+        self.step()
+
+    def on_game_end(self, event : pygame.Event):
+        #Core.end_game runs first and clears the game, so the last recorded wave and score are used
+        self.result = {'victory' : event.victory, 'wave' : self.wave, 'score' : self.score}
+
+    def is_running(self) -> bool:
+        return self.result is None
+
+    def step(self):
+        '''Plays one frame. When the profiler is enabled, every stage of the frame is timed.'''
+        timed : bool = profiler.enabled
+        if timed: profiler.start_frame()
+        core.update_dt(60)
+        events : list[pygame.Event] = pygame.event.get()
+        core.input_state.sample()
+        core.event_manager.process_events(events)
+
+        if core.game.active:
+            self.autopilot.update()
+            if core.game.state != core.game.STATES.paused:
+                if timed: start = perf_counter_ns()
+                Sprite.update_all_sprites(core.dt)
+                if timed: profiler.add('update', start)
+                if timed: start = perf_counter_ns()
+                Sprite.update_all_registered_classes(core.dt)
+                if timed: profiler.add('update_classes', start)
+                self.autopilot.heal()
+                if timed: start = perf_counter_ns()
+                core.game.main_logic(core.dt)
+                if timed: profiler.add('logic', start)
+            self.wave, self.score = core.game.wave_count, core.game.score
+            if timed: start = perf_counter_ns()
+            core.main_ui.update()
+            if timed: profiler.add('ui', start)
+            if self.render:
+                if timed: start = perf_counter_ns()
+                window.fill((94,129,162))
+                Sprite.draw_all_sprites(window)
+                if timed: profiler.add('draw', start)
+                if timed: start = perf_counter_ns()
+                core.main_ui.render(window)
+                if timed: profiler.add('ui', start)
+        if timed: start = perf_counter_ns()
+        core.update()
+        if timed: profiler.add('core_update', start)
+        core.frame_counter += 1
+        self.frame += 1
+        if timed: profiler.end_frame()
+
+    def close(self):
+        '''Ends the game if it is still running, so another session can be started.'''
+        if core.game.active: core.end_game(None)
+        core.event_manager.unbind(core.END_GAME, self.on_game_end)
+
+    def run(self, max_frames : int = 60 * 60 * 30) -> dict:
+        '''Plays until the game ends or max_frames frames have passed. Returns a summary of the session.'''
+        start_time : float = perf_counter()
+        self.start()
+        while self.is_running() and self.frame < max_frames:
+            self.step()
+        wall_time : float = perf_counter() - start_time
+        summary = self.result.copy() if self.result else {'victory' : False, 'wave' : self.wave, 'score' : self.score}
+        summary.update({'finished' : self.result is not None, 'frames' : self.frame, 'game_time' : self.frame * self.fixed_dt,
+                        'wall_time' : wall_time, 'fps' : self.frame / wall_time if wall_time else 0, 'seed' : self.seed})
+        return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a game session without a window.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dt', type=float, default=1 / 60, help='Fixed time step in seconds')
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 30)
+    parser.add_argument('--control', default='Simple', choices=['Simple', 'Mixed', 'Expert', 'Mobile'])
+    parser.add_argument('--weapon', default='Pistol', choices=core.storage.ALL_WEAPONS)
+    parser.add_argument('--armor', default=None, choices=core.storage.ALL_ARMORS)
+    parser.add_argument('--god', action='store_true', help='Keeps the player at full health')
+    parser.add_argument('--render', action='store_true', help='Also draws every frame on the dummy display')
+    parser.add_argument('--batch-movement', action='store_true', help='Moves the zombies with BaseZombie.movement_batch')
+    parser.add_argument('--batch-projectiles', action='store_true', help='Moves the projectiles with BaseProjectile.batch')
+    args = parser.parse_args()
+    BaseZombie.USE_BATCH_MOVEMENT = args.batch_movement
+    BaseProjectile.USE_BATCH_INTEGRATION = args.batch_projectiles
+
+    session = HeadlessSession(args.seed, args.dt, args.control, args.weapon, args.armor, args.god, args.render)
+    summary = session.run(args.max_frames)
+    print(' '.join(f'{key}={value:.2f}' if isinstance(value, float) else f'{key}={value}' for key, value in summary.items()))
+
+if __name__ == '__main__':
+    main()
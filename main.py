@@ -1,5 +1,6 @@
 import pygame
 import asyncio
+from time import perf_counter_ns
 
 pygame.init()
 
@@ -44,33 +45,64 @@ async def main():
     if core.IS_DEBUG: core.storage.upgrade_tokens = 999
     core.set_brightness(core.settings.info['Brightness'])
     while 1:
+        timed : bool = core.profiler.enabled
+        if timed: core.profiler.start_frame()
         core.update_dt(60)
-        for event in pygame.event.get():
-            core.event_manager.process_event(event)
+        if timed: start = perf_counter_ns()
+        events : list[pygame.Event] = pygame.event.get()
+        core.input_state.sample()
+        core.event_manager.process_events(events)
+        if timed: core.profiler.add('events', start)
 
         if core.game.active == False:
-            window.fill(core.menu.bg_color)
             core.menu.update(core.dt)
             core.menu.render(window)
+            core.dirty_display_rects = []
+            core.dirty_renderer.invalidate()
         else:
             if core.game.state != core.game.STATES.paused:
+                if timed: start = perf_counter_ns()
                 Sprite.update_all_sprites(core.dt)
+                if timed: core.profiler.add('update', start)
+                if timed: start = perf_counter_ns()
                 Sprite.update_all_registered_classes(core.dt)
+                if timed: core.profiler.add('update_classes', start)
+                if timed: start = perf_counter_ns()
                 core.game.main_logic(core.dt)
-
-            window.fill((94,129,162))    
-            Sprite.draw_all_sprites(window)
-            core.main_ui.update()
-            core.main_ui.render(window)
-
+                if timed: core.profiler.add('logic', start)
+
+            if core.USE_DIRTY_RECTS:
+                if timed: start = perf_counter_ns()
+                core.main_ui.update()
+                if timed: core.profiler.add('ui', start)
+                if timed: start = perf_counter_ns()
+                core.dirty_display_rects = core.dirty_renderer.render(window, core.main_ui, core.game.background)
+                if timed: core.profiler.add('draw', start)
+            else:
+                if timed: start = perf_counter_ns()
+                window.fill((94,129,162))    
+                Sprite.draw_all_sprites(window)
+                if timed: core.profiler.add('draw', start)
+                if timed: start = perf_counter_ns()
+                core.main_ui.update()
+                core.main_ui.render(window)
+                if timed: core.profiler.add('ui', start)
+
+        if timed: start = perf_counter_ns()
         core.update()
         if core.cycle_timer.isover(): 
             core.fps_sprite.text = f'FPS : {core.get_fps():0.0f}'
             core.cycle_timer.restart()
-        if core.settings.info['Brightness'] != 0:
-            window.blit(core.brightness_map, (0,0), special_flags=core.brightness_map_blend_mode)
-            
-        pygame.display.update()
+        if timed: core.profiler.add('core_update', start)
+        if timed: start = perf_counter_ns()
+        core.apply_post_process(window, core.dirty_display_rects)
+        
+        if core.dirty_display_rects:
+            pygame.display.update(core.dirty_display_rects)
+        else:
+            pygame.display.update()
+        if timed: core.profiler.add('present', start)
+        if timed: core.profiler.end_frame()
         core.frame_counter += 1
         clock.tick(core.FPS)
         await asyncio.sleep(0)
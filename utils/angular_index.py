@@ -0,0 +1,69 @@
+import pygame
+from math import atan2, degrees
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+class AngularIndex:
+    '''Targets around an origin, sorted by bearing, for "nearest target within a cone" queries.
+    Building it costs one normalize per target. A query only looks at the targets whose bearing is close to the query direction.'''
+    def __init__(self) -> None:
+        self.origin : pygame.Vector2 = pygame.Vector2(0, 0)
+        self.bearings : list[float] = []
+        self.targets : list[Any] = []
+        self.directions : list[pygame.Vector2] = []
+        self.orders : list[int] = []
+        self.key : Any = None
+
+    def build(self, origin : pygame.Vector2, targets : Iterable[Any], get_position : Callable[[Any], pygame.Vector2], key : Any = None):
+        '''Indexes targets around origin. Targets exactly on origin have no direction and are left out.
+        key can be anything identifying the state the index was built from, see is_valid.'''
+        self.origin = origin.copy()
+        self.key = key
+        entries : list[tuple[float, int, Any, pygame.Vector2]] = []
+        for order, target in enumerate(targets):
+            offset : pygame.Vector2 = get_position(target) - origin
+            if not offset: continue
+            direction = offset.normalize()
+            entries.append((degrees(atan2(direction.y, direction.x)), order, target, direction))
+        entries.sort(key = lambda entry : (entry[0], entry[1]))
+        self.bearings = [entry[0] for entry in entries]
+        self.orders = [entry[1] for entry in entries]
+        self.targets = [entry[2] for entry in entries]
+        self.directions = [entry[3] for entry in entries]
+
+    def is_valid(self, key : Any) -> bool:
+        return self.key is not None and self.key == key
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    @staticmethod
+    def get_angle_diff(direction : pygame.Vector2, other : pygame.Vector2) -> float:
+        '''Unsigned angle between two directions, in degrees between 0 and 180.'''
+        angle_diff = abs(direction.angle_to(other))
+        if angle_diff > 180: angle_diff = 360 - angle_diff
+        return angle_diff
+
+    def nearest_in_cone(self, direction : pygame.Vector2, max_angle : float = 180) -> tuple[Any, float, pygame.Vector2]|None:
+        '''Returns (target, angle, unit direction to the target) for the target with the smallest angle to direction,
+        if that angle is below max_angle. Targets indexed first win ties.'''
+        count : int = len(self.bearings)
+        if not count: return None
+        query_bearing : float = degrees(atan2(direction.y, direction.x))
+        start : int = bisect_left(self.bearings, query_bearing)
+        best : tuple[float, int, int]|None = None
+        #Bearings only approximate the angle used for the result, so the walk goes slightly past the best angle found
+        for step in (1, -1):
+            index : int = start if step == 1 else start - 1
+            for _ in range(count):
+                bearing_diff = abs(self.bearings[index % count] - query_bearing)
+                if bearing_diff > 180: bearing_diff = 360 - bearing_diff
+                limit = max_angle if best is None else min(max_angle, best[0])
+                if bearing_diff > limit + 1e-6: break
+                position = index % count
+                angle_diff = self.get_angle_diff(self.directions[position], direction)
+                candidate = (angle_diff, self.orders[position], position)
+                if angle_diff < max_angle and (best is None or candidate < best): best = candidate
+                index += step
+        if best is None: return None
+        return self.targets[best[2]], best[0], self.directions[best[2]]
@@ -0,0 +1,66 @@
+from math import floor
+from utils.helpers import tuple_vec_average
+
+PointType = tuple[float, float]
+
+def bucket_points(points : list[PointType], cell_size : float) -> dict[tuple[int, int], list[int]]:
+    '''Returns a dict mapping each grid cell to the indexes of the points inside it, in ascending order.'''
+    cells : dict[tuple[int, int], list[int]] = {}
+    for index, (x, y) in enumerate(points):
+        key = (floor(x / cell_size), floor(y / cell_size))
+        cell = cells.get(key, None)
+        if cell is None:
+            cells[key] = [index]
+        else:
+            cell.append(index)
+    return cells
+
+def get_later_neighbours(points : list[PointType], cells : dict[tuple[int, int], list[int]], index : int,
+                         cell_size : float) -> list[int]:
+    '''Returns the indexes greater than index found in the 3x3 block of cells around points[index], in ascending order.'''
+    x, y = points[index]
+    cx, cy = floor(x / cell_size), floor(y / cell_size)
+    result : list[int] = []
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            cell = cells.get((cx + ox, cy + oy), None)
+            if cell is None: continue
+            for other_index in cell:
+                if other_index > index: result.append(other_index)
+    result.sort()
+    return result
+
+def find_clusters(points : list[PointType], radius : float, min_count : int = 3) -> dict[PointType, int]:
+    '''Groups nearby points and returns a dict of {group center : point count}.
+
+    A point starts a cluster when at least min_count - 1 later points are within radius of it.
+    Clusters whose starting points are closer than radius are then merged greedily, in order.'''
+    radius_squared : float = radius * radius
+    cells = bucket_points(points, radius)
+    clusters : dict[PointType, set[int]] = {}
+    for index, (x, y) in enumerate(points):
+        members : set[int] = {index}
+        for other_index in get_later_neighbours(points, cells, index, radius):
+            ox, oy = points[other_index]
+            if (x - ox) ** 2 + (y - oy) ** 2 <= radius_squared:
+                members.add(other_index)
+        if len(members) >= min_count: clusters[(x, y)] = members
+
+    centers : list[PointType] = list(clusters)
+    center_cells = bucket_points(centers, radius)
+    banned : set[int] = set()
+    grouped_clusters : dict[PointType, int] = {}
+    for index, (x, y) in enumerate(centers):
+        if index in banned: continue
+        group : list[PointType] = [centers[index]]
+        members : set[int] = set(clusters[centers[index]])
+        for other_index in get_later_neighbours(centers, center_cells, index, radius):
+            if other_index in banned: continue
+            ox, oy = centers[other_index]
+            if (x - ox) ** 2 + (y - oy) ** 2 < radius_squared:
+                group.append(centers[other_index])
+                members.update(clusters[centers[other_index]])
+                banned.add(other_index)
+        banned.add(index)
+        grouped_clusters[tuple_vec_average(group)] = len(members)
+    return grouped_clusters
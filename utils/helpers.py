@@ -3,6 +3,7 @@ from math import copysign
 from typing import Callable, Any, Union
 from random import random
 from collections import OrderedDict
+from utils.surface_factory import surface_factory
 
 def to_roman(num : int) -> str:
     if num == 0: return '0'
@@ -115,7 +116,12 @@ def random_float(a : float, b : float):
 
 
 def make_upgrade_bar(width : int = 100, length : int = 20, count = 5, border : int = 3, border_color : str|ColorType = 'Black', 
-                     bg_color : str|ColorType = (90, 90, 90)):
+                     bg_color : str|ColorType = (90, 90, 90), shared : bool = False):
+    '''Returns a private copy unless shared is True : shared surfaces come from surface_factory and must not be modified.'''
+    args = (width, length, count, border, border_color, bg_color)
+    return surface_factory.get(_draw_upgrade_bar, *args) if shared else surface_factory.make(_draw_upgrade_bar, *args)
+
+def _draw_upgrade_bar(width : int, length : int, count : int, border : int, border_color : str|ColorType, bg_color : str|ColorType):
     surf = pygame.surface.Surface((width + border * 2, (length + border) * count + border))
     surf.fill(border_color)
     pygame.draw.rect(surf, bg_color, (border, border, width, (length + border) * count - border))
@@ -130,14 +136,24 @@ def reset_upgrade_bar(surf : pygame.Surface, count : int = 5, width : int = 100,
     for index in range(count):
         pygame.draw.rect(surf, bg_color, (border, (length + border) * index + border, width, length))
 
-def make_right_arrow(height : int, width : int, color : ColorType = (255, 0, 0), colorkey : ColorType = (0, 255, 0)) -> pygame.Surface:
+def make_right_arrow(height : int, width : int, color : ColorType = (255, 0, 0), colorkey : ColorType = (0, 255, 0), shared : bool = False) -> pygame.Surface:
+    '''Returns a private copy unless shared is True : shared surfaces come from surface_factory and must not be modified.'''
+    args = (height, width, color, colorkey)
+    return surface_factory.get(_draw_right_arrow, *args) if shared else surface_factory.make(_draw_right_arrow, *args)
+
+def _draw_right_arrow(height : int, width : int, color : ColorType, colorkey : ColorType) -> pygame.Surface:
     surface = pygame.surface.Surface((width, height))
     surface.set_colorkey(colorkey)
     surface.fill(colorkey)
     pygame.draw.polygon(surface, color, [(0,0), (width, height // 2), (0, height)])
     return surface
 
-def make_circle(radius : int, color : ColorType, colorkey : ColorType = (0, 255, 0)) -> pygame.Surface:
+def make_circle(radius : int, color : ColorType, colorkey : ColorType = (0, 255, 0), shared : bool = False) -> pygame.Surface:
+    '''Returns a private copy unless shared is True : shared surfaces come from surface_factory and must not be modified.'''
+    args = (radius, color, colorkey)
+    return surface_factory.get(_draw_circle, *args) if shared else surface_factory.make(_draw_circle, *args)
+
+def _draw_circle(radius : int, color : ColorType, colorkey : ColorType) -> pygame.Surface:
     d = radius * 2
     surface : pygame.Surface = pygame.Surface((d, d))
     surface.set_colorkey(colorkey)
@@ -0,0 +1,49 @@
+import pygame
+from typing import Sequence
+
+class InputState:
+    '''Keyboard, mouse and touch state, sampled once per frame so every reader of a frame sees the same input.
+    fingers maps the id of every finger on the screen to its position in pixels. It is kept up to date by the touch events,
+    not by sample. Until the first sample, nothing is pressed.
+    move_vector (WASD) and arrow_vector (arrow keys) are unit directions, or (0, 0) when no direction is held.'''
+    MOVE_KEYS : tuple[int, int, int, int] = (pygame.K_a, pygame.K_d, pygame.K_s, pygame.K_w)
+    ARROW_KEYS : tuple[int, int, int, int] = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_UP)
+
+    def __init__(self) -> None:
+        self.keys : Sequence[bool]|None = None
+        self.mouse_buttons : tuple[bool, ...] = (False, False, False)
+        self.mouse_pos : pygame.Vector2 = pygame.Vector2(0, 0)
+        self.fingers : dict[int, tuple[float, float]] = {}
+        self.move_vector : pygame.Vector2 = pygame.Vector2(0, 0)
+        self.arrow_vector : pygame.Vector2 = pygame.Vector2(0, 0)
+        self.frame : int = 0
+
+    def sample(self):
+        '''Reads the current input. Call it once per frame, after the event queue was pumped.'''
+        self.keys = pygame.key.get_pressed()
+        self.mouse_buttons = pygame.mouse.get_pressed()
+        self.mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
+        self.move_vector = self.get_direction(self.MOVE_KEYS)
+        self.arrow_vector = self.get_direction(self.ARROW_KEYS)
+        self.frame += 1
+
+    def is_pressed(self, key : int) -> bool:
+        return bool(self.keys[key]) if self.keys is not None else False
+
+    def get_direction(self, keys : tuple[int, int, int, int]) -> pygame.Vector2:
+        '''Unit direction held with the (left, right, down, up) keys.'''
+        left, right, down, up = keys
+        move_vector : pygame.Vector2 = pygame.Vector2(0,0)
+        if self.keys is None: return move_vector
+        if self.keys[left]:
+            move_vector += pygame.Vector2(-1, 0)
+        if self.keys[right]:
+            move_vector += pygame.Vector2(1, 0)
+        if self.keys[down]:
+            move_vector += pygame.Vector2(0, 1)
+        if self.keys[up]:
+            move_vector += pygame.Vector2(0, -1)
+        if move_vector.magnitude() != 0: move_vector.normalize_ip()
+        return move_vector
+
+input_state : InputState = InputState()
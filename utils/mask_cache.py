@@ -0,0 +1,53 @@
+import pygame
+from collections import OrderedDict
+
+ColorKeyType = tuple[int, int, int, int]|None
+
+class MaskCache:
+    '''Bounded LRU cache of collision masks keyed by (surface id, colorkey), so sprites sharing an image share one pygame.Mask.
+    The colorkey is part of the key, so changing it does not need an invalidation. Any other change to the pixels of a cached surface does:
+    call invalidate with the surface after drawing on it. The returned masks are shared, do not modify them.'''
+    def __init__(self, max_size : int = 256) -> None:
+        self.max_size : int = max_size
+        self.entries : OrderedDict[tuple[int, ColorKeyType], tuple[pygame.Surface, pygame.Mask]] = OrderedDict()
+        self.hits : int = 0
+        self.misses : int = 0
+
+    def get(self, surface : pygame.Surface) -> pygame.Mask:
+        '''Same as pygame.mask.from_surface(surface), reusing the mask of a previous call when possible.'''
+        key = (id(surface), surface.get_colorkey())
+        entry = self.entries.get(key, None)
+        if entry is not None and entry[0] is surface:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        mask = pygame.mask.from_surface(surface)
+        #The source is kept alive by its entry, so its id cannot be reused while the entry exists
+        self.entries[key] = (surface, mask)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return mask
+
+    def invalidate(self, surface : pygame.Surface):
+        '''Forgets every mask made from surface. Call it after the pixels of a surface that may be cached have changed.'''
+        surface_id = id(surface)
+        for key in [key for key, entry in self.entries.items() if key[0] == surface_id and entry[0] is surface]:
+            self.entries.pop(key)
+
+    def resize(self, max_size : int):
+        self.max_size = max_size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> dict[str, int|float]:
+        lookups = self.hits + self.misses
+        return {'hits' : self.hits, 'misses' : self.misses, 'size' : len(self.entries), 'max_size' : self.max_size,
+                'hit_rate' : (self.hits / lookups) if lookups else 0}
+
+mask_cache : MaskCache = MaskCache()
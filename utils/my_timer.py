@@ -2,15 +2,26 @@ from time import perf_counter
 from typing import Callable
 
 class Timer:
-    
+    '''When frame_cache is True, timestamps are only read once per clock_epoch.
+    Only enable it when every time source ultimately reads a FrameClock, or time will stop advancing.'''
+    frame_cache : bool = False
+    clock_epoch : int = 0
+
     @staticmethod
     def time_source() -> float:
         return perf_counter()
     
     def get_timestamp(self) -> float:
+        if Timer.frame_cache:
+            if self._timestamp_epoch == Timer.clock_epoch: return self._timestamp
+            self._timestamp = self.time_source() * self.scale_factor
+            self._timestamp_epoch = Timer.clock_epoch
+            return self._timestamp
         return self.time_source() * self.scale_factor
     
     def __init__(self, treshold : float = -1, time_source : Callable[[], float]|None = None, scale_factor : float = 1.0) -> None:
+        self._timestamp : float = 0
+        self._timestamp_epoch : int = -1
         self.duration = treshold
         self.time_source : Callable[[], float]
         if time_source: self.time_source = time_source
@@ -33,6 +44,8 @@ class Timer:
         self.paused = False
         self.pause_start = None
         self.pause_duration = 0
+        #Timers using this one as their time source have to read it again
+        Timer.clock_epoch += 1
     
     def set_duration(self, duration, restart = True):
         self.duration = duration
@@ -76,4 +89,31 @@ class Timer:
             return True
         return False
 
+class FrameClock:
+    '''Reads the real clock once per frame, when sample is called.
+    Timers using get_time as their time source all see the same time for the whole frame.'''
+    def __init__(self, clock : Callable[[], float] = perf_counter) -> None:
+        self.clock : Callable[[], float] = clock
+        self.time : float = clock()
+        self.frame : int = 0
+    
+    def sample(self) -> float:
+        self.time = self.clock()
+        self.frame += 1
+        Timer.clock_epoch += 1
+        return self.time
+    
+    def get_time(self) -> float:
+        return self.time
 
+class ManualClock:
+    '''A clock that only moves when advance is called. Can replace perf_counter as the clock of Core.'''
+    def __init__(self, start_time : float = 0) -> None:
+        self.time : float = start_time
+    
+    def advance(self, seconds : float) -> float:
+        self.time += seconds
+        return self.time
+    
+    def __call__(self) -> float:
+        return self.time
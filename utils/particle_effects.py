@@ -5,6 +5,7 @@ import utils.interpolation as interpolation
 from random import random
 from math import sin, radians, cos
 from game.sprite import Sprite
+from utils.pool_list import PoolList
 from utils.pivot_2d import Pivot2D
 
 def __random_float(a, b):
@@ -24,8 +25,8 @@ def vec_from_angle(angle, magnitude = 1) -> pygame.Vector2:
 
 
 class Particle(Sprite):
-    active_elements : list['Particle'] = []
-    inactive_elements : list['Particle']  = []
+    active_elements : PoolList['Particle'] = PoolList()
+    inactive_elements : PoolList['Particle'] = PoolList()
     test_image = pygame.surface.Surface((4,4))
     pygame.draw.rect(test_image, 'White', (0, 0, 4, 4))
 
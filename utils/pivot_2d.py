@@ -1,17 +1,21 @@
 import pygame
 from typing import Any
+from utils.rotation_cache import RotationCache, rotation_cache
 def rotate_around_pivot_accurate(image : pygame.Surface, pos : pygame.Vector2, angle : float,
-                        offset : pygame.Vector2 = None, debug = False, colorkey : pygame.Color|None = None):
-    
-    if colorkey is not None:
-        prev_colorkey = image.get_colorkey()
-        image.set_colorkey(colorkey)
-
-    new_image = pygame.transform.rotate(image, -angle)
+                        offset : pygame.Vector2 = None, debug = False, colorkey : pygame.Color|None = None,
+                        cache : RotationCache|None = None):
+    '''If a cache is given, the rotated image comes from it and the angle of the image is quantized. The position is not.'''
+    if cache is not None:
+        new_image = cache.rotate(image, -angle, colorkey)
+    else:
+        if colorkey is not None:
+            prev_colorkey = image.get_colorkey()
+            image.set_colorkey(colorkey)
+        new_image = pygame.transform.rotate(image, -angle)
+        if colorkey is not None: image.set_colorkey(prev_colorkey)
     new_pos = pos - offset.rotate(angle)
 
     new_rect = new_image.get_rect(center = round(new_pos))
-    if colorkey is not None: image.set_colorkey(prev_colorkey)
     if debug:
         return new_image, new_rect, new_pos, [pygame.Vector2(0,0)]
     else:
@@ -70,11 +74,13 @@ class Pivot2D:
         offset = new_value - self.position
         self.origin += offset
     
-    def rotate_image(self, image : pygame.Surface) -> tuple[pygame.Surface, pygame.Rect, pygame.Vector2]:
-        return rotate_around_pivot_accurate(image, self._origin, self._angle, self._pivot_offset, debug=False, colorkey=self.img_colorkey)
+    def rotate_image(self, image : pygame.Surface, use_cache : bool = False) -> tuple[pygame.Surface, pygame.Rect, pygame.Vector2]:
+        '''Only set use_cache for images that never change, the result is shared with every other user of the image.'''
+        return rotate_around_pivot_accurate(image, self._origin, self._angle, self._pivot_offset, debug=False, colorkey=self.img_colorkey,
+                                            cache=rotation_cache if use_cache else None)
     
     def rotate_og_image(self):
-        return self.rotate_image(self.original_image)
+        return self.rotate_image(self.original_image, use_cache=True)
     
     def rotate_image_debug(self, image : pygame.Surface) -> tuple[pygame.Surface, pygame.Rect, pygame.Vector2, Any]:
         return rotate_around_pivot_accurate(image, self._origin, self._angle, self._pivot_offset, debug=True, colorkey=self.img_colorkey)
\ No newline at end of file
@@ -0,0 +1,96 @@
+from typing import Generic, Iterator, TypeVar, Callable, Any
+
+T = TypeVar('T')
+
+class PoolList(Generic[T]):
+    '''Insertion ordered collection of unique elements with O(1) append, remove and membership checks.
+    Removed elements leave a hole in the slot list that gets compacted away once no iteration is running.
+    Iterating sees elements appended during the loop, like a list, and skips elements removed during it.'''
+    COMPACT_THRESHOLD : int = 16
+
+    def __init__(self, elements : list[T]|None = None) -> None:
+        self.slots : list[T|None] = []
+        self.indexes : dict[T, int] = {}
+        self.holes : int = 0
+        self.head : int = 0
+        self.iterating : int = 0
+        if elements:
+            for element in elements: self.append(element)
+
+    def append(self, element : T):
+        '''Adds element at the end. Nothing changes if the element is already present.'''
+        if element in self.indexes: return
+        self.indexes[element] = len(self.slots)
+        self.slots.append(element)
+
+    def remove(self, element : T):
+        '''Removes element. Raises a ValueError if it is not present.'''
+        index = self.indexes.pop(element, None)
+        if index is None: raise ValueError(f'{element} not in PoolList')
+        self.slots[index] = None
+        self.holes += 1
+        if self.iterating: return
+        if self.holes > PoolList.COMPACT_THRESHOLD and self.holes * 2 > len(self.slots): self.compact()
+
+    def discard(self, element : T):
+        '''Removes element if it is present.'''
+        if element in self.indexes: self.remove(element)
+
+    def compact(self):
+        '''Removes every hole from the slot list. Must not be called while iterating.'''
+        if not self.holes: return
+        self.slots = [element for element in self.slots if element is not None]
+        self.indexes = {element : index for index, element in enumerate(self.slots)}
+        self.holes = 0
+        self.head = 0
+
+    def clear(self):
+        self.slots.clear()
+        self.indexes.clear()
+        self.holes = 0
+        self.head = 0
+
+    def sort(self, key : Callable[[T], Any]|None = None, reverse : bool = False):
+        '''Stable in-place sort, same as list.sort.'''
+        self.compact()
+        self.slots.sort(key=key, reverse=reverse)
+        self.indexes = {element : index for index, element in enumerate(self.slots)}
+
+    def first(self) -> T:
+        '''Returns the oldest element in amortized O(1). Raises an IndexError if empty.'''
+        slots = self.slots
+        head = self.head
+        size = len(slots)
+        while head < size and slots[head] is None: head += 1
+        self.head = head
+        if head >= size: raise IndexError('PoolList index out of range')
+        return slots[head]
+
+    def __getitem__(self, index : int) -> T:
+        if not self.holes: return self.slots[index]
+        if index == 0: return self.first()
+        if self.iterating: return [element for element in self.slots if element is not None][index]
+        self.compact()
+        return self.slots[index]
+
+    def __iter__(self) -> Iterator[T]:
+        if self.holes and not self.iterating: self.compact()
+        self.iterating += 1
+        try:
+            slots = self.slots
+            index = 0
+            while index < len(slots):
+                element = slots[index]
+                index += 1
+                if element is not None: yield element
+        finally:
+            self.iterating -= 1
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __contains__(self, element : Any) -> bool:
+        return element in self.indexes
+
+    def __repr__(self) -> str:
+        return f'PoolList({[element for element in self.slots if element is not None]})'
@@ -0,0 +1,75 @@
+from time import perf_counter_ns
+from collections import deque
+import json
+
+class FrameRecord:
+    '''Section times of a single frame, and every timed event of that frame as (name, start, end) in perf_counter_ns.'''
+    def __init__(self, start : int, sections : dict[str, int], events : list[tuple[str, int, int]]) -> None:
+        self.start : int = start
+        self.sections : dict[str, int] = sections
+        self.events : list[tuple[str, int, int]] = events
+
+class Profiler:
+    '''Adds up the time spent in named sections of the current frame, in nanoseconds.
+    Sections can be nested : a section includes the time of the sections timed inside of it.
+    Timed code should only read the clock when enabled is True, so a disabled profiler costs one attribute check.
+    The last history_size frames are kept in a ring buffer.'''
+    def __init__(self, history_size : int = 240) -> None:
+        self.enabled : bool = False
+        self.record_events : bool = True
+        self.current : dict[str, int] = {}
+        self.current_events : list[tuple[str, int, int]] = []
+        self.frame_start : int = 0
+        self.frame_count : int = 0
+        self.history : deque[FrameRecord] = deque(maxlen=history_size)
+
+    def start_frame(self):
+        self.current = {}
+        self.current_events = []
+        self.frame_start = perf_counter_ns()
+
+    def add(self, name : str, start : int):
+        '''Adds the time elapsed since start (a perf_counter_ns reading) to the section name.'''
+        end = perf_counter_ns()
+        self.current[name] = self.current.get(name, 0) + end - start
+        if self.record_events: self.current_events.append((name, start, end))
+
+    def end_frame(self) -> dict[str, int]:
+        '''Returns the section times of the frame. The whole frame is stored under "frame".'''
+        self.current['frame'] = perf_counter_ns() - self.frame_start
+        self.history.append(FrameRecord(self.frame_start, self.current, self.current_events))
+        self.frame_count += 1
+        return self.current
+
+    def resize(self, history_size : int):
+        self.history = deque(self.history, maxlen=history_size)
+
+    def clear(self):
+        self.history.clear()
+
+    def get_averages(self) -> dict[str, float]:
+        '''Returns the average time of every section over the history, in milliseconds.'''
+        if not self.history: return {}
+        totals : dict[str, int] = {}
+        for record in self.history:
+            for name, duration in record.sections.items():
+                totals[name] = totals.get(name, 0) + duration
+        return {name : total / len(self.history) / 1_000_000 for name, total in totals.items()}
+
+    def get_chrome_trace(self) -> dict:
+        '''Returns the history in the Chrome trace event format (chrome://tracing or ui.perfetto.dev).'''
+        if not self.history: return {'traceEvents' : [], 'displayTimeUnit' : 'ms'}
+        origin : int = self.history[0].start
+        trace_events : list[dict] = []
+        for record in self.history:
+            trace_events.append({'name' : 'frame', 'ph' : 'X', 'pid' : 1, 'tid' : 1, 'ts' : (record.start - origin) / 1000,
+                                 'dur' : record.sections['frame'] / 1000})
+            for name, start, end in record.events:
+                trace_events.append({'name' : name, 'ph' : 'X', 'pid' : 1, 'tid' : 1, 'ts' : (start - origin) / 1000, 'dur' : (end - start) / 1000})
+        return {'traceEvents' : trace_events, 'displayTimeUnit' : 'ms'}
+
+    def export_chrome_trace(self, path : str = 'profile_trace.json'):
+        with open(path, 'w') as file:
+            json.dump(self.get_chrome_trace(), file)
+
+profiler : Profiler = Profiler()
@@ -0,0 +1,102 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable
+
+def get_zindex(element : Any) -> int:
+    return element.zindex
+
+class RenderQueue(list):
+    '''zindex ordered draw list. Elements are binary-inserted when added and the whole list is only
+    re-sorted after a zindex change, so steady state frames skip sorting entirely.
+    Equal zindexes keep their insertion order, same as appending then doing a stable sort.'''
+    zindex_version : int = 0
+
+    def __init__(self, elements : Iterable[Any] = ()) -> None:
+        super().__init__(elements)
+        self.sorted_version : int = -1
+        self.refresh()
+
+    @staticmethod
+    def on_zindex_changed():
+        RenderQueue.zindex_version += 1
+
+    def add(self, element : Any):
+        '''Inserts element after every element with a lower or equal zindex.'''
+        self.refresh()
+        self.insert(bisect_right(self, element.zindex, key=get_zindex), element)
+
+    def discard(self, element : Any):
+        '''Removes the first occurrence of element. Only the elements sharing its zindex are searched.'''
+        self.refresh()
+        start : int = bisect_left(self, element.zindex, key=get_zindex)
+        end : int = bisect_right(self, element.zindex, lo=start, key=get_zindex)
+        for index in range(start, end):
+            if self[index] is element:
+                del self[index]
+                return
+        self.remove(element)
+
+    def refresh(self):
+        '''Re-sorts the queue if any zindex changed since the last sort.'''
+        if self.sorted_version == RenderQueue.zindex_version: return
+        self.sort(key=get_zindex)
+        self.sorted_version = RenderQueue.zindex_version
+
+class RenderList(list):
+    '''list that counts its own mutations, so cached render queues built from it know when to rebuild.'''
+    def __init__(self, elements : Iterable[Any] = ()) -> None:
+        super().__init__(elements)
+        self.version : int = 0
+
+    def _changed(self):
+        self.version += 1
+
+    def append(self, element : Any):
+        super().append(element)
+        self._changed()
+
+    def extend(self, elements : Iterable[Any]):
+        super().extend(elements)
+        self._changed()
+
+    def insert(self, index : int, element : Any):
+        super().insert(index, element)
+        self._changed()
+
+    def remove(self, element : Any):
+        super().remove(element)
+        self._changed()
+
+    def pop(self, index : int = -1) -> Any:
+        element = super().pop(index)
+        self._changed()
+        return element
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, elements : Iterable[Any]):
+        result = super().__iadd__(elements)
+        self._changed()
+        return result
+
+    def __imul__(self, count : int):
+        result = super().__imul__(count)
+        self._changed()
+        return result
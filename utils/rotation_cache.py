@@ -0,0 +1,73 @@
+import pygame
+from collections import OrderedDict
+
+ColorKeyType = tuple[int, int, int, int]|None
+
+class RotationCache:
+    '''Bounded LRU cache of rotated surfaces keyed by (source surface id, quantized angle, colorkey).
+    Only use it with source surfaces that never change after creation. The returned surfaces are shared, do not modify them.'''
+    def __init__(self, max_size : int = 512, angle_step : float = 1) -> None:
+        self.max_size : int = max_size
+        self.angle_step : float = angle_step
+        self.entries : OrderedDict[tuple[int, float, ColorKeyType], tuple[pygame.Surface, pygame.Surface]] = OrderedDict()
+        self.hits : int = 0
+        self.misses : int = 0
+        self.evictions : int = 0
+
+    def quantize(self, angle : float) -> float:
+        '''Snaps angle to the closest multiple of angle_step. An angle_step of 0 disables quantization.'''
+        if self.angle_step <= 0: return angle
+        return round(angle / self.angle_step) * self.angle_step
+
+    def rotate(self, surface : pygame.Surface, angle : float, colorkey : pygame.Color|tuple|None = None) -> pygame.Surface:
+        '''Same as pygame.transform.rotate(surface, angle), with angle quantized.
+        If colorkey is given, it is used as the colorkey of surface during the rotation.'''
+        quantized_angle = self.quantize(angle)
+        used_colorkey = surface.get_colorkey() if colorkey is None else tuple(pygame.Color(colorkey))
+        key = (id(surface), quantized_angle, used_colorkey)
+        entry = self.entries.get(key, None)
+        if entry is not None and entry[0] is surface:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        if colorkey is not None:
+            prev_colorkey = surface.get_colorkey()
+            surface.set_colorkey(colorkey)
+        rotated = pygame.transform.rotate(surface, quantized_angle)
+        if colorkey is not None: surface.set_colorkey(prev_colorkey)
+        #The source is kept alive by its entry, so its id cannot be reused while the entry exists
+        self.entries[key] = (surface, rotated)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return rotated
+
+    def resize(self, max_size : int):
+        self.max_size = max_size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def set_angle_step(self, angle_step : float):
+        '''Changes the quantization step. Clears the cache since the old entries would never be hit again.'''
+        if angle_step == self.angle_step: return
+        self.angle_step = angle_step
+        self.clear()
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> dict[str, int|float]:
+        lookups = self.hits + self.misses
+        return {'hits' : self.hits, 'misses' : self.misses, 'evictions' : self.evictions, 'size' : len(self.entries),
+                'max_size' : self.max_size, 'hit_rate' : (self.hits / lookups) if lookups else 0}
+
+rotation_cache : RotationCache = RotationCache()
@@ -0,0 +1,91 @@
+import pygame
+from typing import Any, Iterable
+
+class SpatialGrid:
+    '''Uniform grid broadphase. Elements are bucketed by the cells their rect overlaps.'''
+    def __init__(self, cell_size : int = 64) -> None:
+        self.cell_size : int = cell_size
+        self.cells : dict[tuple[int, int], set[Any]] = {}
+        self.element_ranges : dict[Any, tuple[int, int, int, int]] = {}
+        self.order : dict[Any, int] = {}
+        self.order_counter : int = 0
+        self.stale : bool = True
+
+    def get_cell_range(self, rect : pygame.Rect) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def rebuild(self, elements : Iterable[Any]):
+        '''Clears the grid and inserts every element that has a rect, keeping the iteration order of elements.'''
+        self.clear()
+        for element in elements:
+            if element.rect is None: continue
+            self.insert(element, element.rect)
+        self.stale = False
+
+    def clear(self):
+        self.cells.clear()
+        self.element_ranges.clear()
+        self.order.clear()
+        self.order_counter = 0
+
+    def insert(self, element : Any, rect : pygame.Rect):
+        cell_range = self.get_cell_range(rect)
+        self.element_ranges[element] = cell_range
+        self.order[element] = self.order_counter
+        self.order_counter += 1
+        self._add_to_cells(element, cell_range)
+
+    def update(self, element : Any, rect : pygame.Rect|None):
+        '''Moves an element to the cells covered by rect. Inserts it if it was not in the grid yet.'''
+        if rect is None:
+            self.remove(element)
+            return
+        old_range = self.element_ranges.get(element, None)
+        if old_range is None:
+            self.insert(element, rect)
+            return
+        new_range = self.get_cell_range(rect)
+        if new_range == old_range: return
+        self._remove_from_cells(element, old_range)
+        self._add_to_cells(element, new_range)
+        self.element_ranges[element] = new_range
+
+    def remove(self, element : Any):
+        old_range = self.element_ranges.pop(element, None)
+        if old_range is None: return
+        self.order.pop(element)
+        self._remove_from_cells(element, old_range)
+
+    def query(self, rect : pygame.Rect) -> list[Any]:
+        '''Returns every element sharing a cell with rect, in insertion order.'''
+        min_x, min_y, max_x, max_y = self.get_cell_range(rect)
+        cells = self.cells
+        found : set[Any] = set()
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                cell = cells.get((x, y), None)
+                if cell: found.update(cell)
+        if len(found) <= 1: return list(found)
+        return sorted(found, key=self.order.__getitem__)
+
+    def _add_to_cells(self, element : Any, cell_range : tuple[int, int, int, int]):
+        min_x, min_y, max_x, max_y = cell_range
+        cells = self.cells
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                cell = cells.get((x, y), None)
+                if cell is None:
+                    cells[(x, y)] = {element}
+                else:
+                    cell.add(element)
+
+    def _remove_from_cells(self, element : Any, cell_range : tuple[int, int, int, int]):
+        min_x, min_y, max_x, max_y = cell_range
+        cells = self.cells
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                cell = cells.get((x, y), None)
+                if cell is None: continue
+                cell.discard(element)
+                if not cell: cells.pop((x, y))
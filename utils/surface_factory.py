@@ -0,0 +1,58 @@
+import pygame
+from collections import OrderedDict
+from typing import Callable, Any
+
+class SurfaceFactory:
+    '''Bounded LRU cache of generated surfaces keyed by (builder, arguments), so drawing the same primitive twice only draws it once.
+    get returns the shared surface, which must be treated as read only : do not draw on it or change its alpha or colorkey.
+    make returns a private copy of it, for callers that modify the surface.'''
+    def __init__(self, max_size : int = 128) -> None:
+        self.max_size : int = max_size
+        self.entries : OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits : int = 0
+        self.misses : int = 0
+        self.evictions : int = 0
+
+    @staticmethod
+    def freeze(value : Any) -> Any:
+        '''Makes an argument usable in a key. Lists (as used for colors) become tuples.'''
+        if isinstance(value, (list, tuple)): return tuple(SurfaceFactory.freeze(element) for element in value)
+        if isinstance(value, pygame.Color): return tuple(value)
+        return value
+
+    def get(self, builder : Callable[..., pygame.Surface], *args) -> pygame.Surface:
+        '''Returns the shared surface made by builder(*args). The arguments must be hashable once lists are turned into tuples.'''
+        key = (builder, self.freeze(args))
+        surface = self.entries.get(key, None)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = builder(*args)
+        self.entries[key] = surface
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def make(self, builder : Callable[..., pygame.Surface], *args) -> pygame.Surface:
+        '''Same as builder(*args), copied from the shared surface when possible.'''
+        return self.get(builder, *args).copy()
+
+    def resize(self, max_size : int):
+        self.max_size = max_size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> dict[str, int|float]:
+        lookups = self.hits + self.misses
+        return {'hits' : self.hits, 'misses' : self.misses, 'evictions' : self.evictions, 'size' : len(self.entries),
+                'max_size' : self.max_size, 'hit_rate' : (self.hits / lookups) if lookups else 0}
+
+surface_factory : SurfaceFactory = SurfaceFactory()
@@ -0,0 +1,182 @@
+import pygame
+from collections import OrderedDict
+from typing import Any
+
+ColorType = pygame.Color|str|tuple|list
+
+class GlyphAtlas:
+    '''Pre-stroked glyphs of one (font, color, stroke color, stroke width), used to compose stroked text without rendering it.
+    Every glyph keeps its fill and an outline stamp (the glyph blitted at the 9 stroke offsets).
+    Composing a string blits every outline stamp, then every fill, which gives the same pixels as stroking the whole string.
+    Only glyphs drawn entirely inside their own cell can be composed this way, see supports.'''
+    def __init__(self, font : pygame.Font, color : ColorType, stroke_color : ColorType, stroke_width : int) -> None:
+        self.font : pygame.Font = font
+        self.color : ColorType = color
+        self.stroke_color : ColorType = stroke_color
+        self.stroke_width : int = stroke_width
+        self.height : int = font.get_height()
+        self.glyphs : dict[str, tuple[pygame.Surface, pygame.Surface, int]|None] = {}
+        self.opaque_scratch : pygame.Surface|None = None
+        self.alpha_scratch : pygame.Surface|None = None
+
+    def get_glyph(self, char : str) -> tuple[pygame.Surface, pygame.Surface, int]|None:
+        '''Returns (fill, outline stamp, advance) for char, or None if char cannot be composed.'''
+        if char in self.glyphs: return self.glyphs[char]
+        glyph = self.make_glyph(char)
+        self.glyphs[char] = glyph
+        return glyph
+
+    def make_glyph(self, char : str) -> tuple[pygame.Surface, pygame.Surface, int]|None:
+        font = self.font
+        if not char.isprintable(): return None
+        metrics = font.metrics(char)[0]
+        if metrics is None: return None
+        min_x, max_x, min_y, max_y, advance = metrics
+        #Glyphs that overhang their cell or stretch the line height render differently inside a string
+        if min_x < 0 or max_x > advance or max_y > font.get_ascent() or min_y < font.get_descent(): return None
+        if font.size(char) != (advance, self.height): return None
+
+        fill = font.render(char, False, self.color)
+        outline = font.render(char, False, self.stroke_color)
+        width = self.stroke_width
+        stamp = pygame.Surface((advance + width * 2, self.height + width * 2))
+        #Every visible pixel of the stamp has the stroke color, so its inverse is free to use as the colorkey
+        stroke_rgb = pygame.Color(self.stroke_color)
+        stamp_colorkey = (255 - stroke_rgb.r, 255 - stroke_rgb.g, 255 - stroke_rgb.b)
+        stamp.fill(stamp_colorkey)
+        for ox in range(3):
+            for oy in range(3):
+                stamp.blit(outline, (ox * width, oy * width))
+        stamp.set_colorkey(stamp_colorkey, pygame.RLEACCEL)
+        fill.set_colorkey(fill.get_colorkey(), pygame.RLEACCEL)
+        return fill, stamp, advance
+
+    def supports(self, text : str) -> bool:
+        return all(self.get_glyph(char) is not None for char in text)
+
+    def render(self, text : str, colorkey : ColorType|None) -> pygame.Surface|None:
+        '''Same as a stroked TextSprite render of text, or None when text has a glyph that cannot be composed.'''
+        if not text or not self.supports(text): return None
+        text_width, text_height = self.font.size(text)
+        glyphs = [self.glyphs[char] for char in text]
+        if sum(glyph[2] for glyph in glyphs) != text_width or text_height != self.height: return None
+
+        width = self.stroke_width
+        final_rect = pygame.Rect(0, 0, text_width + width * 2 + 1, text_height + width * 2 + 1)
+        #Glyphs are composed on a reused scratch surface : blitting on a brand new surface is much slower than copying one
+        scratch = self.get_scratch(final_rect.size, bool(colorkey))
+        scratch.fill(colorkey if colorkey else (0, 0, 0, 0), final_rect)
+
+        x : int = 0
+        outlines : list[tuple[pygame.Surface, tuple[int, int]]] = []
+        fills : list[tuple[pygame.Surface, tuple[int, int]]] = []
+        for fill, stamp, advance in glyphs:
+            outlines.append((stamp, (x, 0)))
+            fills.append((fill, (x + width, width)))
+            x += advance
+        scratch.fblits(outlines)
+        scratch.fblits(fills)
+        final_surf = scratch.subsurface(final_rect).copy()
+        if colorkey:
+            final_surf.set_colorkey(colorkey)
+        return final_surf
+
+    def get_scratch(self, size : tuple[int, int], opaque : bool) -> pygame.Surface:
+        scratch = self.opaque_scratch if opaque else self.alpha_scratch
+        if scratch is None or scratch.get_width() < size[0] or scratch.get_height() < size[1]:
+            scratch_size = (max(size[0], scratch.get_width() if scratch else 256), max(size[1], scratch.get_height() if scratch else 0))
+            scratch = pygame.Surface(scratch_size) if opaque else pygame.Surface(scratch_size, pygame.SRCALPHA)
+            if opaque: self.opaque_scratch = scratch
+            else: self.alpha_scratch = scratch
+        return scratch
+
+class TextCache:
+    '''Bounded LRU cache of rendered strings, plus a glyph atlas per (font, color, stroke color, stroke width) for stroked text.
+    Fonts are keyed by identity : call clear after changing the size or style of a font that was used.
+    The returned surfaces are shared, copy them before drawing on them or changing their alpha.'''
+    def __init__(self, max_size : int = 128) -> None:
+        self.max_size : int = max_size
+        self.entries : OrderedDict[tuple, tuple[pygame.Font, pygame.Surface]] = OrderedDict()
+        self.atlases : dict[tuple, GlyphAtlas] = {}
+        self.hits : int = 0
+        self.misses : int = 0
+
+    @staticmethod
+    def normalize_color(color : ColorType|None) -> tuple[int, int, int, int]|None:
+        if color is None: return None
+        return tuple(pygame.Color(color))
+
+    def render(self, font : pygame.Font, text : str, color : ColorType, antialias : bool, stroke_color : ColorType|None = None,
+               stroke_width : int|None = None, colorkey : ColorType|None = None, wraplength : int = 0) -> pygame.Surface:
+        '''Same surface as TextSprite._render_text would make, reusing the result of a previous call when possible.'''
+        stroked : bool = bool(stroke_color and stroke_width)
+        key = (id(font), text, self.normalize_color(color), antialias, self.normalize_color(stroke_color) if stroked else None,
+               stroke_width if stroked else None, self.normalize_color(colorkey) if colorkey else None, wraplength)
+        entry = self.entries.get(key, None)
+        if entry is not None and entry[0] is font:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        surf : pygame.Surface|None = None
+        if stroked:
+            if not antialias and '\n' not in text and (not wraplength or font.size(text)[0] <= wraplength):
+                surf = self.get_atlas(font, color, stroke_color, stroke_width).render(text, colorkey)
+            if surf is None:
+                surf = self.render_stroked(font, text, color, antialias, stroke_color, stroke_width, colorkey, wraplength)
+        else:
+            surf = font.render(text, antialias, color, wraplength=wraplength, bgcolor=colorkey)
+            if colorkey:
+                surf.set_colorkey(colorkey)
+
+        #The font is kept alive by its entry, so its id cannot be reused while the entry exists
+        self.entries[key] = (font, surf)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return surf
+
+    @staticmethod
+    def render_stroked(font : pygame.Font, text : str, color : ColorType, antialias : bool, stroke_color : ColorType, stroke_width : int,
+                       colorkey : ColorType|None, wraplength : int) -> pygame.Surface:
+        final_surf_size = (pygame.Vector2(stroke_width, stroke_width) * 2) + (1,1) + font.size(text)
+        if colorkey:
+            final_surf = pygame.Surface(final_surf_size)
+            final_surf.fill(colorkey)
+        else:
+            final_surf = pygame.Surface(final_surf_size, pygame.SRCALPHA)
+
+        first_text_sprite = font.render(text, antialias, color, wraplength=wraplength)
+        outline = font.render(text, antialias, stroke_color, wraplength=wraplength)
+        for ox in range(-1, 2):
+            for oy in range(-1, 2):
+                final_surf.blit(outline, ((ox + 1) * stroke_width, (oy + 1) * stroke_width))
+        final_surf.blit(first_text_sprite, (stroke_width, stroke_width))
+        if colorkey:
+            final_surf.set_colorkey(colorkey)
+        return final_surf
+
+    def get_atlas(self, font : pygame.Font, color : ColorType, stroke_color : ColorType, stroke_width : int) -> GlyphAtlas:
+        key = (id(font), self.normalize_color(color), self.normalize_color(stroke_color), stroke_width)
+        atlas = self.atlases.get(key, None)
+        if atlas is None or atlas.font is not font:
+            atlas = GlyphAtlas(font, color, stroke_color, stroke_width)
+            self.atlases[key] = atlas
+        return atlas
+
+    def resize(self, max_size : int):
+        self.max_size = max_size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.atlases.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {'hits' : self.hits, 'misses' : self.misses, 'size' : len(self.entries), 'max_size' : self.max_size,
+                'atlases' : len(self.atlases), 'hit_rate' : (self.hits / lookups) if lookups else 0}
+
+text_cache : TextCache = TextCache()
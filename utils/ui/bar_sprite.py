@@ -0,0 +1,27 @@
+import pygame
+from utils.ui.ui_sprite import UiSprite
+from utils.helpers import make_upgrade_bar, reset_upgrade_bar, ColorType
+
+class BarSprite(UiSprite):
+    '''A single upgrade-bar style gauge that keeps its drawn state.
+    The fill is quantized to whole pixels, and the bar is only redrawn when the fill width or the color changes.'''
+    def __init__(self, rect_alignment : str, position : tuple[int, int], width : int = 150, length : int = 25, border : int = 3,
+                 name : str|None = None, bg_color : str|ColorType = (90, 90, 90), zindex : int = 0):
+        surf = make_upgrade_bar(width, length, 1, border, bg_color=bg_color)
+        super().__init__(surf, surf.get_rect(**{rect_alignment : position}), 0, name, zindex=zindex)
+        self.bar_width : int = width
+        self.bar_length : int = length
+        self.border : int = border
+        self.bg_color : str|ColorType = bg_color
+        self.fill_width : int = -1
+        self.fill_color : str|ColorType|None = None
+
+    def set_fill(self, percent : float, color : str|ColorType) -> bool:
+        '''Fills percent of the bar with color. Returns True if the bar had to be redrawn.'''
+        fill_width : int = max(int(pygame.math.lerp(0, self.bar_width, percent)), 0)
+        if fill_width == self.fill_width and color == self.fill_color: return False
+        self.fill_width = fill_width
+        self.fill_color = color
+        reset_upgrade_bar(self.surf, 1, self.bar_width, self.bar_length, self.border, self.bg_color)
+        pygame.draw.rect(self.surf, color, (self.border, self.border, fill_width, self.bar_length))
+        return True
@@ -0,0 +1,53 @@
+import pygame
+from utils.ui.ui_sprite import UiSprite
+from utils.profiler import Profiler
+
+SECTION_COLORS : dict[str, tuple[int, int, int]] = {
+    'events' : (150, 150, 150),
+    'update' : (230, 80, 70),
+    'update_classes' : (240, 160, 60),
+    'logic' : (240, 230, 90),
+    'draw' : (80, 170, 240),
+    'ui' : (170, 110, 240),
+    'core_update' : (90, 210, 120),
+    'present' : (240, 120, 200)
+}
+
+class ProfilerOverlay(UiSprite):
+    '''Stacked bar graph of the last frames recorded by a profiler, one bar per frame.
+    Only the top level sections in SECTION_COLORS are stacked. The white line is the frame budget.'''
+    def __init__(self, profiler : Profiler, position : tuple[int, int], size : tuple[int, int] = (240, 64), bar_width : int = 2,
+                 max_ms : float = 33.3, budget_ms : float = 1000 / 60, name : str = 'profiler_overlay', zindex : int = 998):
+        surf = pygame.Surface(size)
+        super().__init__(surf, surf.get_rect(bottomleft = position), 0, name, zindex=zindex)
+        self.profiler : Profiler = profiler
+        self.bar_width : int = bar_width
+        self.max_ms : float = max_ms
+        self.budget_ms : float = budget_ms
+        self.drawn_frame : int = -1
+        self.surf.set_alpha(210)
+
+    def redraw(self):
+        width, height = self.surf.get_size()
+        self.surf.fill((20, 20, 20))
+        scale : float = height / (self.max_ms * 1_000_000)
+        bar_count : int = width // self.bar_width
+        history = self.profiler.history
+        records = list(history)[-bar_count:] if len(history) > bar_count else history
+        for index, record in enumerate(records):
+            x = index * self.bar_width
+            bottom : float = height
+            for name, color in SECTION_COLORS.items():
+                duration = record.sections.get(name, 0)
+                if not duration: continue
+                top = bottom - duration * scale
+                pygame.draw.rect(self.surf, color, (x, round(top), self.bar_width, round(bottom) - round(top)))
+                bottom = top
+                if bottom < 0: break
+        budget_y = height - round(self.budget_ms * 1_000_000 * scale)
+        pygame.draw.line(self.surf, (255, 255, 255), (0, budget_y), (width, budget_y))
+        self.drawn_frame = self.profiler.frame_count
+
+    def draw(self, display : pygame.Surface):
+        if self.drawn_frame != self.profiler.frame_count: self.redraw()
+        super().draw(display)
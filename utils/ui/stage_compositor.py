@@ -0,0 +1,57 @@
+import pygame
+from utils.ui.ui_sprite import UiSprite
+from utils.helpers import ColorType
+from typing import Iterable
+
+class StageCompositor:
+    '''Draws a menu stage as one baked layer (the background and the static sprites) with the live sprites drawn on top.
+    A sprite is static when it draws like a plain UiSprite, by blitting surf at rect. Sprites with their own draw (tooltips, overlays)
+    and the sprites passed as live (temp alerts) are drawn every frame.
+    A static sprite that comes after a live sprite it overlaps is drawn live too, so the result is the same as drawing every sprite in order.
+    The layer is baked again when the baked sprites, their surf, rect, alpha or colorkey change.
+    Drawing on the surf of a baked sprite in place cannot be detected : call invalidate after doing so.'''
+    def __init__(self) -> None:
+        self.layer : pygame.Surface|None = None
+        self.signature : tuple|None = None
+        self.bakes : int = 0
+        self.frames : int = 0
+
+    @staticmethod
+    def is_static(sprite : UiSprite) -> bool:
+        return type(sprite).draw is UiSprite.draw
+
+    def invalidate(self):
+        self.signature = None
+
+    def render(self, display : pygame.Surface, sprites : Iterable[UiSprite], bg_color : ColorType, live : Iterable[UiSprite] = ()):
+        '''Same as filling display with bg_color then drawing every visible sprite of sprites in order.'''
+        live = set(live)
+        baked : list[tuple] = []
+        live_sprites : list[UiSprite] = []
+        live_rects : list[pygame.Rect] = []
+        for sprite in sprites:
+            if not sprite.visible: continue
+            if sprite not in live and self.is_static(sprite) and sprite.rect.collidelist(live_rects) == -1:
+                surf = sprite.surf
+                baked.append((sprite, surf, tuple(sprite.rect), surf.get_alpha(), surf.get_colorkey()))
+            else:
+                live_sprites.append(sprite)
+                live_rects.append(sprite.rect)
+
+        signature = (display.get_size(), display.get_bitsize(), display.get_masks(), pygame.Color(bg_color), baked)
+        if self.layer is None or signature != self.signature:
+            if self.signature is None or self.signature[:3] != signature[:3]:
+                self.layer = pygame.Surface(display.get_size(), 0, display)
+            self.layer.fill(bg_color)
+            for entry in baked:
+                entry[0].draw(self.layer)
+            self.signature = signature
+            self.bakes += 1
+
+        self.frames += 1
+        display.blit(self.layer, (0, 0))
+        for sprite in live_sprites:
+            sprite.draw(display)
+
+    def get_stats(self) -> dict[str, int|float]:
+        return {'bakes' : self.bakes, 'frames' : self.frames, 'bake_rate' : (self.bakes / self.frames) if self.frames else 0}
@@ -2,6 +2,7 @@ import pygame
 from math import floor
 from utils.ui.ui_sprite import UiSprite
 from utils.helpers import rotate_around_pivot_accurate, ColorType
+from utils.text_cache import text_cache
 class TextSprite(UiSprite):
     main_font = pygame.font.Font(r'assets/fonts/Pixeltype.ttf', 40)
     def __init__(self, position : pygame.Vector2|tuple, rect_alignment : str|None, tag: int, text : str, name: str | None = None, attributes: dict = None, 
@@ -27,6 +28,7 @@ class TextSprite(UiSprite):
         if text_stroke_settings:
             self._text_stroke_color, self._text_stroke_width = text_stroke_settings
         self.rect_alignment = rect_alignment
+        self._text_surf : pygame.Surface|None = None
         self._render_text(force_surf = True)
         self.rect = self.surf.get_rect()
         self.rect.__setattr__(self.rect_alignment, position) if self.rect_alignment is not None else self.rect.__setattr__('center', position)
@@ -50,6 +52,8 @@ class TextSprite(UiSprite):
             else:
                 self.surf, self.rect, self._position = self._pivot.rotate_image(self.surf)
 
+        if abs(opacity_offset) > 0.002 or self.filters:
+            self._own_surf()
         if abs(opacity_offset) > 0.002:
             self.surf.set_alpha(self._opacity * 255)        
         for filter in self.filters:
@@ -64,38 +68,23 @@ class TextSprite(UiSprite):
         color : pygame.Color|str
         AA_enabled : bool
         font, color, AA_enabled = self.text_settings
-        if self._text_stroke_color and self._text_stroke_width:
-            final_surf_size = (pygame.Vector2(self._text_stroke_width, self._text_stroke_width) * 2) + (1,1) + font.size(self._true_text)
-            if self.colorkey:
-                final_surf = pygame.Surface(final_surf_size)
-                final_surf.fill(self.colorkey)
-            else:
-                final_surf = pygame.Surface(final_surf_size, pygame.SRCALPHA)
-
-            first_text_sprite = font.render(self._true_text, AA_enabled, color, wraplength=self.max_line_lentgh)
-            outline = font.render(self._true_text, AA_enabled, self._text_stroke_color, wraplength=self.max_line_lentgh)
-            
-
-            
-            for ox in range(-1, 2):
-                for oy in range(-1, 2):
-                    if ox or oy or 1:
-                        dx, dy = (ox + 1) * self._text_stroke_width, (oy + 1) * self._text_stroke_width
-                        #if ((self._text_stroke_width + final_surf.get_width()) % 2):
-                        #    dx += 0 if ox > 0 else 0
-                        #if ((self.text_stroke_width + final_surf.get_height()) % 2):
-                        #    dy += 0 if oy > 0 else 0
-                        final_surf.blit(outline, (dx, dy))
-
-
-            final_surf.blit(first_text_sprite, (self._text_stroke_width, self._text_stroke_width))            
-            self.surf = final_surf
-            if self.colorkey:
-                self.surf.set_colorkey(self.colorkey)
-        else:
-            self.surf = font.render(self._true_text, AA_enabled, color, wraplength=self.max_line_lentgh, bgcolor=self.colorkey)
-            if self.colorkey:
-                self.surf.set_colorkey(self.colorkey)
+        self.surf = text_cache.render(font, self._true_text, color, AA_enabled, self._text_stroke_color, self._text_stroke_width,
+                                      self.colorkey, self.max_line_lentgh)
+        self._text_surf = self.surf
+    
+    def _own_surf(self):
+        '''Copies the surface if it is still the one shared with the text cache, before it gets modified.'''
+        if self.surf is self._text_surf:
+            self.surf = self.surf.copy()
+    
+    @property
+    def opacity(self):
+        return self._opacity
+    
+    @opacity.setter
+    def opacity(self, val):
+        self._own_surf()
+        UiSprite.opacity.fset(self, val)
     
     @property
     def text(self):
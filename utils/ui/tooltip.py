@@ -1,6 +1,7 @@
 import pygame
 from utils.ui.textsprite import TextSprite
 from utils.helpers import ColorType
+from utils.input_state import input_state
 class ToolTip(TextSprite):
     def __init__(self, position : pygame.Vector2|tuple, rect_alignment : str|None, tag: int, text : str, area : pygame.Rect, 
                  name: str | None = None, attributes: dict = None, data: dict = None, zindex: int = 0, 
@@ -14,7 +15,7 @@ class ToolTip(TextSprite):
         
     
     def update(self, delta: float):
-        self.is_hovered = self.hover_area.collidepoint(pygame.mouse.get_pos())
+        self.is_hovered = self.hover_area.collidepoint(input_state.mouse_pos)
     
     def draw(self, display: pygame.Surface):
         if self.visible and self.is_hovered:
@@ -1,6 +1,7 @@
 import pygame
 from utils.helpers import rotate_around_pivot_accurate, ColorType
 from utils.pivot_2d import Pivot2D
+from utils.render_queue import RenderQueue
 
 
 
@@ -35,7 +36,7 @@ class UiSprite:
         self.rect : pygame.Rect = rect if rect is not None else self.surf.get_rect() if self.surf is not None else None
         self.tag : int = tag
         self.name : str|None = name
-        self.zindex : int = zindex
+        self._zindex : int = zindex
         
         self.visible : bool = True
         self.interactible : bool = True
@@ -108,6 +109,16 @@ class UiSprite:
             if not has_modified: self.surf = self.og_surf.copy()
             filter.apply(self.surf)
 
+    @property
+    def zindex(self) -> int:
+        return self._zindex
+    
+    @zindex.setter
+    def zindex(self, new_val : int):
+        if new_val == self._zindex: return
+        self._zindex = new_val
+        RenderQueue.on_zindex_changed()
+
     @property
     def opacity(self):
         return self._opacity